@@ -0,0 +1,232 @@
+# assets_gantt.py
+# Bibliotecas de terceiros dos gráficos de Gantt (virtual-select) servidas
+# pela pasta static do próprio app, sem depender do CDN.
+#
+# Cada rerun cria um iframe novo do Gantt, que buscava de novo o CSS/JS no
+# cdn.jsdelivr.net; nos servidores de obra sem internet os filtros nem
+# abriam. Os arquivos ficam em static/vendor/<pacote>@<versao>/ (baixados uma
+# vez com `python assets_gantt.py baixar` e versionados no repositório, junto
+# com o manifesto static/vendor/assets_gantt.json, que fixa o sha256 e o SRI
+# de cada arquivo). O carregador de payload_gantt os busca com ?v=<hash>, que
+# faz o servidor estático responder com cache longo, e com verificação de
+# integridade (SRI).
+#
+# O servidor estático do Streamlit entrega .js/.css como text/plain com
+# "nosniff", então eles não funcionam em <script src>/<link>: o carregador
+# busca o conteúdo e o injeta na página. Sem server.enableStaticServing o
+# conteúdo vai embutido no HTML. Sem a cópia local (checkout sem
+# static/vendor/) os arquivos vêm do CDN, na versão fixada e com SRI quando o
+# manifesto existe; GANTT_ASSETS_CDN=0 proíbe o CDN (servidores sem internet),
+# e então a falta de um arquivo é um erro já no Python.
+
+import base64
+import hashlib
+import json
+import os
+import sys
+import urllib.request
+from functools import lru_cache
+
+from payload_gantt import PASTA_STATIC, url_estatico
+
+SUBPASTA_VENDOR = "vendor"
+
+# (pacote npm, versão, arquivo no pacote, tipo), na ordem de carregamento
+ASSETS_GANTT = (
+    ("virtual-select-plugin", "1.0.39", "dist/virtual-select.min.css", "css"),
+    ("virtual-select-plugin", "1.0.39", "dist/virtual-select.min.js", "js"),
+)
+URL_CDN = "https://cdn.jsdelivr.net/npm/{pacote}@{versao}/{arquivo}"
+# Metadados do pacote no jsDelivr, com o sha256 de cada arquivo
+URL_METADADOS_CDN = "https://data.jsdelivr.com/v1/package/npm/{pacote}@{versao}"
+TIMEOUT_DOWNLOAD_SEGUNDOS = 30
+# Manifesto versionado: {caminho em static/: {pacote, versao, arquivo, sha256, integridade}}
+ARQUIVO_MANIFESTO = os.path.join(PASTA_STATIC, SUBPASTA_VENDOR, "assets_gantt.json")
+# Busca do CDN quando a cópia local não existe (ou não confere com o manifesto); "0" desliga
+USAR_CDN = os.getenv("GANTT_ASSETS_CDN", "1") != "0"
+
+_avisos_emitidos = set()
+
+
+def _relativo_local(pacote, versao, arquivo):
+    return f"{SUBPASTA_VENDOR}/{pacote}@{versao}/{os.path.basename(arquivo)}"
+
+
+def _caminho_local(pacote, versao, arquivo):
+    return os.path.join(PASTA_STATIC, *_relativo_local(pacote, versao, arquivo).split("/"))
+
+
+def integridade(conteudo):
+    """Valor do atributo integrity (SRI) para o conteúdo."""
+    return "sha384-" + base64.b64encode(hashlib.sha384(conteudo).digest()).decode("ascii")
+
+
+def _avisar_uma_vez(mensagem):
+    if mensagem not in _avisos_emitidos:
+        _avisos_emitidos.add(mensagem)
+        print(f"[GANTT] {mensagem}")
+
+
+@lru_cache(maxsize=4)
+def _manifesto(mtime):
+    # mtime na chave: um manifesto regravado é lido de novo
+    with open(ARQUIVO_MANIFESTO, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def ler_manifesto():
+    """Manifesto dos arquivos versionados em static/vendor/; vazio se não existe."""
+    if not os.path.exists(ARQUIVO_MANIFESTO):
+        return {}
+    return _manifesto(os.path.getmtime(ARQUIVO_MANIFESTO))
+
+
+@lru_cache(maxsize=16)
+def _arquivo_local(caminho, mtime):
+    # mtime na chave: um arquivo substituído é lido de novo
+    with open(caminho, "rb") as f:
+        conteudo = f.read()
+    return conteudo, hashlib.sha256(conteudo).hexdigest()
+
+
+def _conteudo_verificado(pacote, versao, arquivo, manifesto):
+    """(conteúdo, registro do manifesto) da cópia local, ou None se ausente ou diferente do manifesto."""
+    relativo = _relativo_local(pacote, versao, arquivo)
+    caminho = _caminho_local(pacote, versao, arquivo)
+    registro = manifesto.get(relativo)
+    if not os.path.exists(caminho) or registro is None:
+        _avisar_uma_vez(f"{relativo} ausente ou fora do manifesto; rode `python assets_gantt.py baixar`.")
+        return None
+
+    conteudo, sha256 = _arquivo_local(caminho, os.path.getmtime(caminho))
+    if sha256 != registro["sha256"]:
+        _avisar_uma_vez(f"{relativo} não confere com o sha256 do manifesto; arquivo ignorado.")
+        return None
+    return conteudo, registro
+
+
+def descrever_assets(base_url="", servir_estatico=True, usar_cdn=USAR_CDN):
+    """
+    Lista de assets para o carregador do Gantt (payload_gantt.html_carregador),
+    cada um {'tipo', 'arquivo'} e mais:
+    - 'url' e 'integridade': cópia local conferida com o manifesto, pelo
+      servidor estático, ou o CDN na versão fixada quando a cópia local não
+      serve (integridade do manifesto, se houver);
+    - 'conteudo': o texto do arquivo, sem servidor estático.
+
+    Levanta RuntimeError se um arquivo não está disponível e usar_cdn é
+    falso: o Gantt não funciona sem eles.
+    """
+    manifesto = ler_manifesto()
+    assets = []
+    for pacote, versao, arquivo, tipo in ASSETS_GANTT:
+        asset = {"tipo": tipo, "arquivo": f"{pacote}@{versao}/{arquivo}"}
+        local = _conteudo_verificado(pacote, versao, arquivo, manifesto)
+        if local is not None:
+            conteudo, registro = local
+            if servir_estatico:
+                url = url_estatico(_relativo_local(pacote, versao, arquivo), base_url)
+                asset.update(url=f"{url}?v={registro['sha256'][:16]}", integridade=registro["integridade"])
+            else:
+                asset["conteudo"] = conteudo.decode("utf-8")
+        elif usar_cdn:
+            registro = manifesto.get(_relativo_local(pacote, versao, arquivo), {})
+            if not registro.get("integridade"):
+                _avisar_uma_vez(f"{asset['arquivo']} vem do CDN sem verificação de integridade (sem manifesto).")
+            asset.update(url=URL_CDN.format(pacote=pacote, versao=versao, arquivo=arquivo),
+                         integridade=registro.get("integridade"))
+        else:
+            raise RuntimeError(
+                f"{asset['arquivo']} não está em static/{SUBPASTA_VENDOR}/ e o CDN está desligado "
+                f"(GANTT_ASSETS_CDN=0): rode `python assets_gantt.py baixar`."
+            )
+        assets.append(asset)
+    return assets
+
+
+def _baixar(url):
+    with urllib.request.urlopen(url, timeout=TIMEOUT_DOWNLOAD_SEGUNDOS) as resposta:
+        return resposta.read()
+
+
+def _sha256_publicados(pacote, versao):
+    """{caminho no pacote: sha256 em base64} segundo o jsDelivr; vazio se indisponível."""
+    try:
+        metadados = json.loads(_baixar(URL_METADADOS_CDN.format(pacote=pacote, versao=versao)))
+    except (OSError, ValueError) as e:
+        print(f"[GANTT] Não foi possível obter os hashes publicados de {pacote}@{versao}: {e}")
+        return {}
+
+    hashes = {}
+    pendentes = [("", metadados.get("files", []))]
+    while pendentes:
+        prefixo, itens = pendentes.pop()
+        for item in itens:
+            caminho = prefixo + item.get("name", "")
+            if item.get("type") == "directory":
+                pendentes.append((caminho + "/", item.get("files", [])))
+            elif item.get("hash"):
+                hashes[caminho] = item["hash"]
+    return hashes
+
+
+def baixar_assets():
+    """
+    Baixa os ASSETS_GANTT do CDN para static/vendor/, conferindo cada arquivo
+    com o sha256 publicado pelo jsDelivr, e grava o manifesto com o sha256 e o
+    SRI de cada um. Arquivos já presentes são mantidos (e conferidos).
+    """
+    hashes_por_pacote = {}
+    manifesto = {}
+    for pacote, versao, arquivo, tipo in ASSETS_GANTT:
+        relativo = _relativo_local(pacote, versao, arquivo)
+        caminho = _caminho_local(pacote, versao, arquivo)
+        if (pacote, versao) not in hashes_por_pacote:
+            hashes_por_pacote[(pacote, versao)] = _sha256_publicados(pacote, versao)
+        esperado = hashes_por_pacote[(pacote, versao)].get(arquivo)
+
+        existe = os.path.exists(caminho)
+        if existe:
+            with open(caminho, "rb") as f:
+                conteudo = f.read()
+        else:
+            conteudo = _baixar(URL_CDN.format(pacote=pacote, versao=versao, arquivo=arquivo))
+
+        obtido = base64.b64encode(hashlib.sha256(conteudo).digest()).decode("ascii")
+        if esperado and obtido != esperado:
+            raise ValueError(f"Hash de {pacote}@{versao}/{arquivo} não confere com o publicado pelo jsDelivr.")
+        if not esperado:
+            print(f"[GANTT] Aviso: {arquivo} registrado sem conferência de hash.")
+
+        if existe:
+            print(f"[GANTT] {relativo} já existe.")
+        else:
+            os.makedirs(os.path.dirname(caminho), exist_ok=True)
+            with open(caminho, "wb") as f:
+                f.write(conteudo)
+            print(f"[GANTT] {relativo} gravado ({len(conteudo) / 1024:.0f} KB, {integridade(conteudo)}).")
+
+        manifesto[relativo] = {
+            "pacote": pacote,
+            "versao": versao,
+            "arquivo": arquivo,
+            "sha256": hashlib.sha256(conteudo).hexdigest(),
+            "integridade": integridade(conteudo),
+        }
+
+    os.makedirs(os.path.dirname(ARQUIVO_MANIFESTO), exist_ok=True)
+    with open(ARQUIVO_MANIFESTO, "w", encoding="utf-8") as f:
+        json.dump(manifesto, f, indent=2, sort_keys=True)
+        f.write("\n")
+    print(f"[GANTT] Manifesto gravado em {os.path.relpath(ARQUIVO_MANIFESTO, PASTA_STATIC)}; versione static/{SUBPASTA_VENDOR}/.")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] == ["baixar"]:
+        try:
+            baixar_assets()
+        except (OSError, ValueError) as e:
+            print(f"[GANTT] Falha ao baixar os assets: {e}")
+            sys.exit(1)
+    else:
+        print("Uso: python assets_gantt.py baixar")
@@ -0,0 +1,175 @@
+# benchmark_cache_relatorio.py
+# Mede o tempo de carga do relatório do Smartsheet (tratamento_dados_reais)
+# com o cache de ID do relatório em disco, consulta só do modifiedAt e CSV
+# reaproveitado enquanto o relatório não muda.
+#
+# É um benchmark, não um teste: nada o roda automaticamente. Usa um cliente
+# Smartsheet falso, em processo, que registra cada chamada e simula a
+# latência da API (list_reports percorre todos os relatórios da conta; o
+# download do CSV é a parte cara), e troca requests.get da mesma forma. Os
+# asserts só confirmam que o cenário simulado fez as chamadas esperadas (sem
+# list_reports nem download com o mesmo modifiedAt, um download por
+# modifiedAt novo, SDK num diretório temporário quando o download direto
+# falha); dependem desse cliente falso e não cobrem a API real.
+#
+# O cache é gravado num diretório temporário, não em .cache_macrofluxo/.
+#
+# Uso: python benchmarks/benchmark_cache_relatorio.py [n_linhas]
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+from collections import Counter
+from types import SimpleNamespace
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tratamento_dados_reais as tdr
+
+# Latências simuladas da API do Smartsheet
+LATENCIA_LIST_REPORTS_SEGUNDOS = 0.400
+LATENCIA_GET_REPORT_SEGUNDOS = 0.080
+LATENCIA_DOWNLOAD_SEGUNDOS = 1.200
+
+NOME_RELATORIO = tdr.SHEET_NAME
+ID_RELATORIO = 4242
+TOKEN = "token-falso"
+
+
+def gerar_csv(n_linhas):
+    """CSV no formato do relatório, com uma coluna que não é usada."""
+    linhas = ["Empreendimento,Primário,Serviço,%,Data de Início,Data de Fim,Origem Planil"]
+    for i in range(n_linhas):
+        dia = i % 28 + 1
+        linhas.append(f"{i % 40 + 2}.EMP {i % 40},ETAPA{i % 23},Serviço {i % 7},{i % 101}%,"
+                      f"{dia:02d}/03/24,{dia:02d}/09/24,planilha")
+    return ("\n".join(linhas) + "\n").encode("utf-8")
+
+
+class ReportsFalso:
+    """Imita client.Reports do SDK, registrando as chamadas."""
+
+    def __init__(self, chamadas, estado):
+        self.chamadas = chamadas
+        self.estado = estado
+
+    def list_reports(self, include_all=False):
+        self.chamadas["list_reports"] += 1
+        time.sleep(LATENCIA_LIST_REPORTS_SEGUNDOS)
+        outros = [SimpleNamespace(name=f"Outro {i}", id=i) for i in range(50)]
+        return SimpleNamespace(data=outros + [SimpleNamespace(name=NOME_RELATORIO, id=ID_RELATORIO)])
+
+    def get_report(self, report_id, page_size=None):
+        self.chamadas["get_report"] += 1
+        time.sleep(LATENCIA_GET_REPORT_SEGUNDOS)
+        if report_id != ID_RELATORIO:
+            raise ValueError(f"Relatório {report_id} não encontrado")
+        return SimpleNamespace(modified_at=self.estado["modified_at"])
+
+    def get_report_as_csv(self, report_id, download_path):
+        self.chamadas["download_sdk"] += 1
+        self.estado["diretorios_sdk"].append(download_path)
+        time.sleep(LATENCIA_DOWNLOAD_SEGUNDOS)
+        nome = "relatorio.csv"
+        with open(os.path.join(download_path, nome), "wb") as f:
+            f.write(self.estado["csv"])
+        return SimpleNamespace(filename=nome)
+
+
+def instalar_download_direto(chamadas, estado):
+    """Substitui requests.get (download direto do CSV pela API)."""
+    def get_falso(url, headers=None, timeout=None):
+        chamadas["download_direto"] += 1
+        if estado["falhar_download_direto"]:
+            raise requests.ConnectionError("API indisponível (simulado)")
+        time.sleep(LATENCIA_DOWNLOAD_SEGUNDOS)
+        resposta = requests.Response()
+        resposta.status_code = 200
+        resposta._content = estado["csv"]
+        return resposta
+
+    requests.get = get_falso
+
+
+def carregar(cliente, token):
+    """Mesmo caminho de buscar_e_processar_dados_completos até o DataFrame bruto."""
+    report_id, modified_at = tdr.resolver_relatorio(cliente, NOME_RELATORIO)
+    return tdr.get_report_data(cliente, report_id, modified_at, token)
+
+
+def executar(nome, chamadas, funcao):
+    chamadas.clear()
+    inicio = time.perf_counter()
+    df = funcao()
+    tempo = time.perf_counter() - inicio
+    print(f"{nome:42s} {tempo * 1000:7.0f}ms  {dict(sorted(chamadas.items()))}")
+    return df, Counter(chamadas)
+
+
+def main():
+    n_linhas = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+
+    diretorio_cache = tempfile.mkdtemp(prefix="cache-relatorio-")
+    tdr.ARQUIVO_CACHE_RELATORIO = os.path.join(diretorio_cache, "relatorio_smartsheet.json")
+    tdr.ARQUIVO_CSV_RELATORIO = os.path.join(diretorio_cache, "relatorio_smartsheet.csv")
+
+    chamadas = Counter()
+    estado = {
+        "modified_at": "2024-05-01T10:00:00Z",
+        "csv": gerar_csv(n_linhas),
+        "falhar_download_direto": False,
+        "diretorios_sdk": [],
+    }
+    cliente = SimpleNamespace(Reports=ReportsFalso(chamadas, estado))
+    instalar_download_direto(chamadas, estado)
+
+    print(f"Relatório falso: {n_linhas} linhas ({len(estado['csv']) / 1024:.0f} KB); "
+          f"list_reports {LATENCIA_LIST_REPORTS_SEGUNDOS * 1000:.0f}ms, "
+          f"get_report {LATENCIA_GET_REPORT_SEGUNDOS * 1000:.0f}ms, "
+          f"download {LATENCIA_DOWNLOAD_SEGUNDOS * 1000:.0f}ms\n")
+    try:
+        df_primeira, c = executar("1ª carga (sem cache)", chamadas, lambda: carregar(cliente, TOKEN))
+        assert c == Counter(list_reports=1, get_report=1, download_direto=1), c
+        assert len(df_primeira) == n_linhas
+
+        df, c = executar("2ª carga (modifiedAt igual)", chamadas, lambda: carregar(cliente, TOKEN))
+        assert c == Counter(get_report=1), c
+        assert df.equals(df_primeira)
+
+        estado["modified_at"] = "2024-05-02T08:30:00Z"
+        df, c = executar("Relatório alterado (modifiedAt novo)", chamadas, lambda: carregar(cliente, TOKEN))
+        assert c == Counter(get_report=1, download_direto=1), c
+
+        df, c = executar("Carga seguinte (modifiedAt igual)", chamadas, lambda: carregar(cliente, TOKEN))
+        assert c == Counter(get_report=1), c
+
+        estado["modified_at"] = "2024-05-03T09:00:00Z"
+        estado["falhar_download_direto"] = True
+        df, c = executar("Alterado, download direto falha (SDK)", chamadas, lambda: carregar(cliente, TOKEN))
+        assert c == Counter(get_report=1, download_direto=1, download_sdk=1), c
+        assert df.equals(df_primeira)
+
+        estado["modified_at"] = "2024-05-04T09:00:00Z"
+        df, c = executar("Alterado, sem token (SDK)", chamadas, lambda: carregar(cliente, None))
+        assert c == Counter(get_report=1, download_sdk=1), c
+        assert df.equals(df_primeira)
+
+        # O SDK grava num diretório temporário do sistema, removido após a leitura
+        assert len(estado["diretorios_sdk"]) == 2
+        assert not any(os.path.exists(d) for d in estado["diretorios_sdk"])
+        assert all(not d.startswith(diretorio_cache) for d in estado["diretorios_sdk"])
+
+        df, c = executar("Carga seguinte (modifiedAt igual)", chamadas, lambda: carregar(cliente, None))
+        assert c == Counter(get_report=1), c
+
+        print("\nCenário simulado: chamadas ao cliente falso conforme o esperado.")
+    finally:
+        shutil.rmtree(diretorio_cache, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+# benchmark_pool_mysql.py
+# Compara a latência das operações de baseline abrindo uma conexão nova a
+# cada chamada (comportamento anterior) com o pool de conexao_mysql.
+#
+# Com MYSQL_BENCH_HOST definido, usa um MySQL/MariaDB real, por exemplo:
+#   docker run -d -p 3306:3306 -e MARIADB_ROOT_PASSWORD=senha -e MARIADB_DATABASE=bench mariadb:11
+#   MYSQL_BENCH_HOST=127.0.0.1 MYSQL_BENCH_PASSWORD=senha python benchmarks/benchmark_pool_mysql.py
+#
+# Sem servidor, usa um substituto em processo que simula o custo do handshake
+# (TCP + TLS + autenticação) e de cada consulta, passando pelo código real do
+# mysql.connector.pooling.
+#
+# Uso: python benchmarks/benchmark_pool_mysql.py [n_operacoes]
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import mysql.connector
+from mysql.connector import pooling
+from mysql.connector.connection import MySQLConnection
+
+import conexao_mysql
+
+# Latências simuladas (aproximadas de um RDS em outra região)
+LATENCIA_HANDSHAKE_SEGUNDOS = 0.060
+LATENCIA_CONSULTA_SEGUNDOS = 0.005
+
+
+class ConexaoSimulada(MySQLConnection):
+    """Conexão sem rede: só simula o tempo de handshake e de consulta."""
+
+    def __init__(self, **config):
+        # Sem argumentos é só a validação de configuração do pool (sem rede)
+        if config:
+            time.sleep(LATENCIA_HANDSHAKE_SEGUNDOS)
+        self._conectada = bool(config)
+
+    def config(self, **config):
+        pass
+
+    def is_connected(self):
+        return self._conectada
+
+    def ping(self, reconnect=False, attempts=1, delay=0):
+        time.sleep(LATENCIA_CONSULTA_SEGUNDOS)
+
+    def reset_session(self, user_variables=None, session_variables=None):
+        time.sleep(LATENCIA_CONSULTA_SEGUNDOS)
+
+    def cursor(self, *args, **kwargs):
+        return CursorSimulado()
+
+    def commit(self):
+        pass
+
+    def close(self):
+        self._conectada = False
+
+
+class CursorSimulado:
+    rowcount = 1
+
+    def execute(self, query, params=None):
+        time.sleep(LATENCIA_CONSULTA_SEGUNDOS)
+
+    def fetchall(self):
+        return [(1,)]
+
+    def close(self):
+        pass
+
+
+def instalar_substituto():
+    mysql.connector.connect = ConexaoSimulada
+    pooling.connect = ConexaoSimulada
+
+
+def config_bench():
+    return {
+        'host': os.getenv("MYSQL_BENCH_HOST", "simulado"),
+        'user': os.getenv("MYSQL_BENCH_USER", "root"),
+        'password': os.getenv("MYSQL_BENCH_PASSWORD", ""),
+        'database': os.getenv("MYSQL_BENCH_DATABASE", "bench"),
+        'port': int(os.getenv("MYSQL_BENCH_PORT", "3306")),
+    }
+
+
+def operacao(conn):
+    """Equivalente ao SELECT de metadados de load_baselines."""
+    cursor = conn.cursor()
+    cursor.execute("SELECT 1")
+    cursor.fetchall()
+    cursor.close()
+    conn.close()
+
+
+def medir(obter_conexao, n_operacoes):
+    tempos = []
+    for _ in range(n_operacoes):
+        inicio = time.perf_counter()
+        operacao(obter_conexao())
+        tempos.append(time.perf_counter() - inicio)
+    tempos.sort()
+    return sum(tempos) / len(tempos), tempos[len(tempos) // 2], tempos[int(len(tempos) * 0.95)]
+
+
+def main():
+    n_operacoes = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    config = config_bench()
+
+    if "MYSQL_BENCH_HOST" not in os.environ:
+        instalar_substituto()
+        print(f"Servidor: substituto em processo (handshake {LATENCIA_HANDSHAKE_SEGUNDOS * 1000:.0f}ms, "
+              f"consulta {LATENCIA_CONSULTA_SEGUNDOS * 1000:.0f}ms)")
+    else:
+        print(f"Servidor: {config['host']}:{config['port']}")
+
+    pool = conexao_mysql.PoolMySQL(config, tamanho=conexao_mysql.TAMANHO_POOL, nome="benchmark")
+    inicio = time.perf_counter()
+    pool.obter_conexao().close()
+    print(f"Criação do pool ({pool.tamanho} conexões): {(time.perf_counter() - inicio) * 1000:.0f}ms (uma vez por processo)")
+
+    resultados = {
+        "Conexão nova por chamada": medir(lambda: mysql.connector.connect(**config), n_operacoes),
+        "Pool (com pré-ping)": medir(pool.obter_conexao, n_operacoes),
+    }
+
+    print(f"\n{n_operacoes} operações sequenciais")
+    print(f"{'':28s} {'média':>9s} {'p50':>9s} {'p95':>9s}")
+    for nome, (media, p50, p95) in resultados.items():
+        print(f"{nome:28s} {media * 1000:7.1f}ms {p50 * 1000:7.1f}ms {p95 * 1000:7.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
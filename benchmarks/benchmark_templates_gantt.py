@@ -0,0 +1,152 @@
+# benchmark_templates_gantt.py
+# Compara o tempo de renderização do HTML de cada visão do Gantt:
+#   - caminho anterior: f-string de milhares de linhas avaliada a cada chamada,
+#     com os dados embutidos via json.dumps;
+#   - caminho atual: template pré-compilado (templates_gantt) + carregador do
+#     payload (payload_gantt), sem e com o cache de HTML. O cache é chaveado
+#     por (visão, chave do carregador, hash dos demais campos); a coluna
+#     "carregador" é a serialização e o hash dos dados, feitos a cada chamada.
+#
+# A f-string "anterior" é reconstruída a partir do próprio template (chaves
+# escapadas e campos viram expressões), então as duas versões geram o mesmo
+# HTML, exceto pelos dados.
+#
+# Uso: python benchmarks/benchmark_templates_gantt.py [n_empreendimentos]
+
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import payload_gantt
+import templates_gantt
+
+ETAPAS = [
+    "PROSPECÇÃO", "LEGALIZAÇÃO PARA VENDA", "PULMÃO VENDA", "PL.LIMP", "LEG.LIMP", "ENG. LIMP.",
+    "EXECUÇÃO LIMP.", "PL.TER", "LEG.TER", "ENG. TER.", "EXECUÇÃO TER.", "PL.INFRA", "LEG.INFRA",
+    "ENG. INFRA", "EXECUÇÃO INFRA", "ENG. PAV", "EXECUÇÃO PAV.", "PULMÃO INFRA", "PL.RADIER",
+    "LEG.RADIER", "RADIER", "DEMANDA MÍNIMA", "PE. ÁREAS COMUNS (URB)", "PE. ÁREAS COMUNS (ENG)",
+    "ORÇ. ÁREAS COMUNS", "SUP. ÁREAS COMUNS", "EXECUÇÃO ÁREAS COMUNS",
+]
+SETORES = ["PROSPECÇÃO", "LEGALIZAÇÃO", "PULMÃO", "ENGENHARIA", "INFRA", "PRODUÇÃO", "ARQUITETURA & URBANISMO"]
+
+
+def gerar_tasks(n_empreendimentos, seed=42):
+    """Tasks no formato de construir_tasks_gantt, por empreendimento."""
+    rng = random.Random(seed)
+    base = date(2023, 1, 1)
+    tasks_por_emp = {}
+    for i in range(n_empreendimentos):
+        tasks = []
+        for j, etapa in enumerate(ETAPAS):
+            inicio = base + timedelta(days=rng.randint(0, 700))
+            fim = inicio + timedelta(days=rng.randint(20, 200))
+            tasks.append({
+                "id": f"t{j}", "name": etapa, "numero_etapa": j + 1,
+                "start_previsto": inicio.isoformat(), "end_previsto": fim.isoformat(),
+                "start_real": inicio.isoformat(), "end_real": fim.isoformat(),
+                "end_real_original_raw": fim.isoformat(), "ugb": "SC",
+                "setor": rng.choice(SETORES), "grupo": "LOTEAMENTO", "progress": rng.choice([0, 50, 100]),
+                "inicio_previsto": inicio.strftime("%d/%m/%y"), "termino_previsto": fim.strftime("%d/%m/%y"),
+                "inicio_real": inicio.strftime("%d/%m/%y"), "termino_real": fim.strftime("%d/%m/%y"),
+                "duracao_prev_meses": "3,2", "duracao_real_meses": "3,5", "vt_text": "+4d", "vd_text": "+2d",
+                "status_color_class": "status-default", "baselines": {},
+            })
+        tasks_por_emp[f"EMPREENDIMENTO {i:04d}"] = tasks
+    return tasks_por_emp
+
+
+def montar_casos(n_empreendimentos):
+    """(dados, valores) de cada visão, com a mesma forma usada pelo app."""
+    tasks_por_emp = gerar_tasks(n_empreendimentos)
+    todas = [dict(t, name=emp) for emp, tasks in tasks_por_emp.items() for t in tasks]
+    opcoes_filtro = {"ugbs": ["SC"], "setores": SETORES, "grupos": ["LOTEAMENTO"], "etapas": ETAPAS}
+    projetos = [{"id": f"p{i}", "name": emp, "tasks": tasks} for i, (emp, tasks) in enumerate(tasks_por_emp.items())]
+
+    comuns = {"id": "p0", "largura_timeline_px": 36 * 30, "nome": "Comparativo", "pulmao_meses": 0,
+              "pulmao_status": "Sem Pulmão", "data_min": "2023-01-01", "data_max": "2025-12-31",
+              "tipo_visualizacao": "Ambos", "linhas_baseline_html": "", "total_meses": 36}
+    return {
+        "projeto": (
+            {"projetos": projetos, "projeto": projetos[:1], "tasks_base": projetos[0]["tasks"],
+             "empreendimentos_ordenados": list(tasks_por_emp), "opcoes_filtro": opcoes_filtro},
+            dict(comuns, fundo_baseline="white", borda_baseline="#ccc", titulo_baseline="Baseline Ativa: P0-(padrão)",
+                 opcoes_baseline_html="", exibir_filtro_pulmao="block", indice_projeto=0),
+        ),
+        "consolidado": (
+            {"projeto": [{"id": "p_consolidado", "name": "Comparativo", "tasks": todas}],
+             "dados_por_etapa": {etapa: [t for t in todas if t["id"] == f"t{j}"] for j, etapa in enumerate(ETAPAS)},
+             "tasks_base": todas, "opcoes_filtro": opcoes_filtro},
+            comuns,
+        ),
+        "setor": (
+            {"dados_por_setor": {s: [t for t in todas if t["setor"] == s] for s in SETORES}, "opcoes_filtro": opcoes_filtro},
+            dict(comuns, opcoes_setor_html="", setor_inicial=SETORES[0]),
+        ),
+    }
+
+
+def compilar_fstring_anterior(template):
+    """Código da f-string equivalente ao template, com os dados embutidos como antes."""
+    partes = []
+    for literal, campo in zip(template.literais, template.campos + [None]):
+        partes.append(literal.replace("{", "{{").replace("}", "}}"))
+        if campo == "carregador_dados":
+            partes.append('<script id="gantt-dados" type="application/json">{json.dumps(dados)}</script>')
+        elif campo is not None:
+            partes.append("{%s}" % campo)
+    return compile("f" + repr("".join(partes)), "<fstring>", "eval")
+
+
+def medir(funcao, repeticoes):
+    tempos = []
+    resultado = None
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos), resultado
+
+
+def main():
+    n_empreendimentos = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    payload_gantt.PASTA_PAYLOADS = tempfile.mkdtemp(prefix="gantt_dados_")
+    casos = montar_casos(n_empreendimentos)
+
+    print(f"{n_empreendimentos} empreendimentos x {len(ETAPAS)} etapas")
+    print("Casca = só o HTML/CSS/JS (sem os dados); total = com os dados embutidos (antes) ou publicados no payload (agora)\n")
+    print(f"{'visão':12s} {'casca f-string':>15s} {'casca template':>15s} {'cache':>8s} {'carregador':>11s} "
+          f"{'total antes':>12s} {'total agora':>12s} {'HTML antes':>11s} {'HTML agora':>11s}")
+    for visao, (dados, valores) in casos.items():
+        template = templates_gantt.TEMPLATES[visao]
+        codigo = compilar_fstring_anterior(template)
+        carregador, chave_carregador = payload_gantt.html_carregador(dados)
+        valores_casca = dict(valores, carregador_dados=carregador)
+
+        tempo_fstring, _ = medir(lambda: eval(codigo, {"json": json}, dict(valores, dados={})), 20)
+        tempo_template, _ = medir(lambda: template.renderizar(valores_casca), 20)
+        tempo_cache, _ = medir(lambda: templates_gantt.renderizar(visao, chave_carregador, valores_casca), 20)
+        tempo_carregador, _ = medir(lambda: payload_gantt.html_carregador(dados), 5)
+
+        def renderizar_agora():
+            carregador, chave = payload_gantt.html_carregador(dados)
+            return templates_gantt.renderizar(visao, chave, dict(valores, carregador_dados=carregador))
+
+        tempo_antes, html_antes = medir(lambda: eval(codigo, {"json": json}, dict(valores, dados=dados)), 5)
+        tempo_agora, html_agora = medir(renderizar_agora, 5)
+
+        print(f"{visao:12s} {tempo_fstring * 1000:13.2f}ms {tempo_template * 1000:13.2f}ms {tempo_cache * 1000:6.2f}ms "
+              f"{tempo_carregador * 1000:9.1f}ms "
+              f"{tempo_antes * 1000:10.1f}ms {tempo_agora * 1000:10.1f}ms "
+              f"{len(html_antes) / 1024:9.0f}KB {len(html_agora) / 1024:9.0f}KB")
+
+    print("\nO total agora ainda serializa e hasheia os dados a cada chamada para achar a versão do payload;"
+          "\no ganho principal está no HTML reenviado ao navegador a cada rerun (colunas HTML).")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+# benchmark_tratamento_macrofluxo.py
+# Compara a extração de atributos do tratamento do Macrofluxo:
+#   - caminho anterior: extrair_atributos aplicado linha a linha no unpivot
+#     (até três pd.Series(...).str.extract por linha);
+#   - caminho atual: cada cabeçalho interpretado uma vez e mapeado no unpivot.
+#
+# Uso: python benchmarks/benchmark_tratamento_macrofluxo.py [n_empreendimentos]
+
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tratamento_macrofluxo import extrair_atributos_colunas, transformar_macrofluxo
+
+ETAPAS = [
+    "PROSPEC", "LEGVENDA", "PULVENDA", "PL.LIMP", "LEG.LIMP", "ENG.LIMP", "EXECLIMP",
+    "PL.TER", "LEG.TER", "ENG. TER", "EXECTER", "PL.INFRA", "LEG.INFRA", "ENG.INFRA",
+    "EXECINFRA", "ENG.PAV", "EXEC.PAV", "PL.RAD", "LEG.RAD", "PE. ÁREAS COMUNS (URB)",
+    "PE. ÁREAS COMUNS (ENG)", "ORÇ. ÁREAS COMUNS", "SUP. ÁREAS COMUNS",
+]
+
+
+def gerar_aba_geral(n_empreendimentos, seed=42):
+    """
+    Monta um DataFrame no formato da aba GERAL lida com header=6: colunas
+    fixas (índice, UGB, EMP, TIPO), pares INICIO/TERMINO de cada etapa e
+    colunas 'Unnamed' vazias entre eles.
+    """
+    rng = np.random.default_rng(seed)
+    base = pd.Timestamp("2022-01-01")
+
+    dados = {
+        "Unnamed: 0": [np.nan] * n_empreendimentos,
+        "UGB": rng.choice(["SC", "CA", "SP", "MG", "GO"], n_empreendimentos),
+        "EMP": [f"EMPREENDIMENTO {i:04d}" for i in range(n_empreendimentos)],
+        "TIPO": rng.choice(["LOTEAMENTO", "CONDOMÍNIO"], n_empreendimentos),
+        "Unnamed: 4": [np.nan] * n_empreendimentos,
+    }
+
+    n_coluna = 5
+    cabecalhos = [(etapa, "PREV") for etapa in ETAPAS] + [(etapa, "REAL") for etapa in ETAPAS[:5]]
+    for etapa, tipo in cabecalhos:
+        inicio = base + pd.to_timedelta(rng.integers(0, 900, n_empreendimentos), unit="D")
+        termino = inicio + pd.to_timedelta(rng.integers(10, 200, n_empreendimentos), unit="D")
+        dados[f"{etapa}.{tipo}.INICIO"] = inicio
+        dados[f"{etapa}.{tipo}.TERMINO"] = termino
+        dados[f"Unnamed: {n_coluna + 2}"] = [np.nan] * n_empreendimentos
+        dados[f"Unnamed: {n_coluna + 3}"] = [np.nan] * n_empreendimentos
+        n_coluna += 4
+
+    # Cabeçalho incompleto real da planilha (sem PREV no TERMINO)
+    inicio = base + pd.to_timedelta(rng.integers(0, 900, n_empreendimentos), unit="D")
+    dados["EXECUÇÃO ÁREAS COMUNS.PREV.INICIO"] = inicio
+    dados["EXECUÇÃO ÁREAS COMUNS.TERMINO"] = inicio + pd.to_timedelta(90, unit="D")
+
+    return pd.DataFrame(dados)
+
+
+def extrair_atributos_legado(atributo):
+    """Cópia do extrair_atributos anterior (aplicado linha a linha)."""
+    match_completo = pd.Series(atributo).str.extract(r'(.+)\.(REAL|PREV)\.(INICIO|TERMINO)').iloc[0]
+    if not match_completo.isnull().any():
+        return match_completo
+
+    match_simples = pd.Series(atributo).str.extract(r'(.+)\.(INICIO|TERMINO)').iloc[0]
+    if not match_simples.isnull().any():
+        etapa_tipo = match_simples[0]
+        inicio_fim = match_simples[1]
+
+        match_tipo = pd.Series(etapa_tipo).str.extract(r'(.+)\.(REAL|PREV)').iloc[0]
+        if not match_tipo.isnull().any():
+            return pd.Series([match_tipo[0], match_tipo[1], inicio_fim])
+        else:
+            return pd.Series([etapa_tipo, 'PREV', inicio_fim])
+
+    return pd.Series([None, None, None])
+
+
+def medir(funcao, repeticoes):
+    tempos = []
+    resultado = None
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos), resultado
+
+
+def main():
+    n_empreendimentos = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    df_geral = gerar_aba_geral(n_empreendimentos)
+
+    colunas_unpivot = [col for col in df_geral.columns if ".INICIO" in col or ".TERMINO" in col]
+    colunas_fixas = [col for col in df_geral.columns if col not in colunas_unpivot]
+    df_unpivoted = pd.melt(df_geral, id_vars=colunas_fixas, value_vars=colunas_unpivot,
+                           var_name="Atributo", value_name="Valor")
+
+    print(f"Aba GERAL sintética: {n_empreendimentos} empreendimentos, {len(colunas_unpivot)} colunas de data")
+    print(f"Linhas após o unpivot: {len(df_unpivoted)}")
+
+    def legado():
+        split_data = df_unpivoted['Atributo'].apply(extrair_atributos_legado)
+        split_data.columns = ['Etapa', 'Tipo_Data', 'Inicio_Fim']
+        return split_data
+
+    def atual():
+        split_data = extrair_atributos_colunas(colunas_unpivot).reindex(df_unpivoted['Atributo'].values)
+        split_data.index = df_unpivoted.index
+        return split_data
+
+    tempo_legado, split_legado = medir(legado, 1)
+    tempo_atual, split_atual = medir(atual, 5)
+
+    pd.testing.assert_frame_equal(split_legado, split_atual, check_dtype=False)
+
+    tempo_total, df_final = medir(lambda: transformar_macrofluxo(df_geral), 3)
+
+    print(f"Extração linha a linha (anterior): {tempo_legado * 1000:10.1f} ms")
+    print(f"Extração por cabeçalho (atual):    {tempo_atual * 1000:10.1f} ms")
+    print(f"Ganho: {tempo_legado / tempo_atual:.0f}x (resultados idênticos)")
+    print(f"transformar_macrofluxo completo:   {tempo_total * 1000:10.1f} ms ({len(df_final)} linhas)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,47 @@
+import os
+from functools import lru_cache
+
 import pandas as pd
 import numpy as np
+import holidays
+
+# Calendário de dias úteis: feriados nacionais + feriados estaduais das UFs
+# informadas em FERIADOS_UFS (ex.: "SC,PR"). Sem UFs, só feriados nacionais.
+PAIS_FERIADOS = "BR"
+UFS_FERIADOS = tuple(uf.strip().upper() for uf in os.getenv("FERIADOS_UFS", "").split(",") if uf.strip())
+# Faixa mínima de anos do calendário; datas fora dela ampliam a faixa
+ANO_INICIAL_CALENDARIO = 2015
+ANO_FINAL_CALENDARIO = 2035
+
+
+@lru_cache(maxsize=16)
+def obter_calendario_dias_uteis(ano_inicio=ANO_INICIAL_CALENDARIO, ano_fim=ANO_FINAL_CALENDARIO):
+    """
+    Retorna um np.busdaycalendar (segunda a sexta) com os feriados de
+    ano_inicio a ano_fim. Construído uma vez por faixa de anos.
+    """
+    anos = range(ano_inicio, ano_fim + 1)
+    datas_feriados = set(holidays.country_holidays(PAIS_FERIADOS, years=anos))
+    for uf in UFS_FERIADOS:
+        datas_feriados.update(holidays.country_holidays(PAIS_FERIADOS, subdiv=uf, years=anos))
+    return np.busdaycalendar(holidays=sorted(datas_feriados))
+
+
+def _calendario_para(*datas):
+    """Calendário cuja faixa de anos cobre todas as datas (datetime64[D]) informadas."""
+    ano_inicio, ano_fim = ANO_INICIAL_CALENDARIO, ANO_FINAL_CALENDARIO
+    for valores in datas:
+        validos = valores[~np.isnat(valores)]
+        if len(validos):
+            anos = validos.astype('datetime64[Y]').astype(int) + 1970
+            ano_inicio = min(ano_inicio, int(anos.min()))
+            ano_fim = max(ano_fim, int(anos.max()))
+    return obter_calendario_dias_uteis(ano_inicio, ano_fim)
+
+
+def _para_dias(datas):
+    return pd.to_datetime(pd.Series(datas), errors='coerce').to_numpy().astype('datetime64[D]')
+
 
 def calculate_business_days(start_date, end_date):
     """
@@ -7,15 +49,31 @@ def calculate_business_days(start_date, end_date):
     """
     if pd.isna(start_date) or pd.isna(end_date):
         return np.nan
-    
+
     try:
         # Converter para datetime se necessário
-        start_date = pd.to_datetime(start_date)
-        end_date = pd.to_datetime(end_date)
-        
+        start_date = np.datetime64(pd.to_datetime(start_date).date())
+        end_date = np.datetime64(pd.to_datetime(end_date).date())
+
         # Calcular dias úteis
-        business_days = np.busday_count(start_date.date(), end_date.date())
+        business_days = np.busday_count(start_date, end_date, busdaycal=_calendario_para(np.array([start_date, end_date])))
         return business_days
     except:
         return np.nan
 
+
+def calculate_business_days_array(start_dates, end_dates):
+    """
+    Versão vetorizada de calculate_business_days: recebe colunas de datas e
+    retorna um array com os dias úteis (inteiros; NaN onde faltar alguma data,
+    por isso o dtype é float)
+    """
+    inicio = _para_dias(start_dates)
+    fim = _para_dias(end_dates)
+
+    validos = ~(np.isnat(inicio) | np.isnat(fim))
+    resultado = np.full(len(inicio), np.nan)
+    if validos.any():
+        calendario = _calendario_para(inicio[validos], fim[validos])
+        resultado[validos] = np.busday_count(inicio[validos], fim[validos], busdaycal=calendario)
+    return resultado
@@ -0,0 +1,100 @@
+# componente_gantt.py
+# Componente Streamlit bidirecional que mantém o Gantt montado entre reruns.
+#
+# Com components.html, todo rerun que mudava o HTML (botões Por Projeto / Por
+# Etapa / Por Setor, troca de baseline) recriava o iframe: o navegador
+# interpretava de novo todo o CSS/JS e a rolagem voltava ao início. As ações
+# do Gantt voltavam ao Python por query params, recarregando a página ou
+# abrindo outra sessão em um iframe oculto.
+#
+# Este componente (templates/componente_gantt/index.html, sem build) fica
+# montado sob uma chave fixa e recebe só a visão e a versão do documento; o
+# HTML é publicado em static/ (payload_gantt.publicar_documento) e buscado
+# pela URL. O componente guarda o último documento de cada visão e só troca o
+# documento quando a versão muda, mantendo a posição de rolagem. As ações do
+# usuário voltam por Streamlit.setComponentValue e são tratadas no on_change,
+# antes do rerun desenhar o gráfico com os dados novos.
+#
+# Só as baselines salvas (app.baselines_salvas_gantt) vão como delta: o
+# componente repassa o delta ao documento vivo por postMessage quando a versão
+# do delta muda, e o documento só troca os task.baselines e as opções dos
+# dropdowns (gantt_ponte_componente.js), sem ser buscado nem interpretado de
+# novo. Filtros e dados não são deltas: o HTML do documento é montado e
+# hasheado a cada rerun e, se a versão mudou, o componente troca o documento
+# inteiro (os templates se inicializam do estado global e não reaplicam um
+# conjunto de dados novo no lugar).
+
+import functools
+import json
+import os
+
+import streamlit as st
+import streamlit.components.v1 as components
+
+import payload_gantt
+
+PASTA_COMPONENTE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates", "componente_gantt")
+CHAVE_COMPONENTE = "gantt_macrofluxo"
+
+_componente = components.declare_component("gantt_macrofluxo", path=PASTA_COMPONENTE)
+
+
+def _chave_resposta(key):
+    return f"{key}__resposta"
+
+
+def _ao_receber_acao(key, ao_acionar):
+    acao = st.session_state.get(key)
+    if not acao:
+        return
+
+    print(f"[GANTT] Ação recebida do componente: {acao.get('tipo')} ({acao.get('empreendimento')})")
+    try:
+        resposta = ao_acionar(acao) or {"ok": True}
+    except Exception as e:
+        print(f"[GANTT] Erro ao tratar a ação {acao.get('tipo')}: {e}")
+        resposta = {"ok": False, "mensagem": str(e)}
+    # Entregue ao documento no próximo exibir_gantt
+    st.session_state[_chave_resposta(key)] = dict(resposta, id=acao.get("id"), tipo=acao.get("tipo"))
+
+
+def _delta_com_versao(delta):
+    if delta is None:
+        return None
+    conteudo = json.dumps(delta, sort_keys=True, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return {"versao": payload_gantt.versao_dados(conteudo), "dados": delta}
+
+
+def exibir_gantt(html, altura, visao, delta=None, ao_acionar=None, key=CHAVE_COMPONENTE):
+    """
+    Exibe o HTML de um Gantt (templates_gantt.renderizar) no componente.
+
+    visao: 'projeto', 'consolidado' ou 'setor'; o componente guarda um
+    documento por visão.
+    delta: dict (JSON) entregue ao documento vivo sem trocá-lo, como
+    {'baselines', 'opcoes'} de app.baselines_salvas_gantt; reenviado ao
+    documento só quando muda.
+    ao_acionar(acao): chamada com o dict enviado pelo Gantt ({'tipo', 'id',
+    'visao', ...}); retorna {'ok', 'mensagem'}, que volta ao documento.
+
+    Sem server.enableStaticServing o HTML vai nos argumentos do componente.
+    """
+    base_url = st.get_option("server.baseUrlPath") or ""
+    if st.get_option("server.enableStaticServing"):
+        documento = payload_gantt.publicar_documento(html, base_url)
+        html = None
+    else:
+        documento = {"versao": payload_gantt.versao_dados(html.encode("utf-8")), "url": None}
+
+    return _componente(
+        visao=visao,
+        versao=documento["versao"],
+        url_documento=documento["url"],
+        html=html,
+        delta=_delta_com_versao(delta),
+        altura=altura,
+        resposta=st.session_state.pop(_chave_resposta(key), None),
+        key=key,
+        default=None,
+        on_change=functools.partial(_ao_receber_acao, key, ao_acionar) if ao_acionar else None,
+    )
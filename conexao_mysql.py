@@ -0,0 +1,128 @@
+# conexao_mysql.py
+# Pool de conexões MySQL compartilhado pelo processo.
+#
+# Abrir uma conexão nova com o RDS custa um handshake completo (TCP + TLS +
+# autenticação) a cada consulta. O pool mantém um número fixo de conexões
+# abertas, testa cada uma (ping) antes de entregá-la e a devolve ao pool
+# quando o código chama conn.close(), então as funções existentes não mudam.
+
+import os
+import threading
+import time
+
+import mysql.connector
+from mysql.connector import Error, pooling
+from mysql.connector.errors import PoolError
+
+# Configuração
+TAMANHO_POOL = int(os.getenv("MYSQL_POOL_SIZE", "5"))
+TIMEOUT_CONEXAO_SEGUNDOS = 10
+# Depois de uma falha ao criar o pool (banco fora do ar, credenciais mock),
+# espera este intervalo antes de tentar de novo em vez de pagar o timeout
+# de conexão em toda chamada.
+INTERVALO_NOVA_TENTATIVA_SEGUNDOS = 30
+
+_POOLS = {}
+_POOLS_LOCK = threading.Lock()
+
+
+class PoolMySQL:
+    """
+    Pool de tamanho fixo com criação preguiçosa e verificação de saúde.
+
+    - obter_conexao(): conexão do pool já testada com ping (reconecta se o
+      servidor derrubou a conexão ociosa) ou None se o banco estiver
+      indisponível. conn.close() devolve a conexão ao pool.
+    - Se o pool estiver esgotado, abre uma conexão avulsa para não travar a
+      requisição.
+    """
+
+    def __init__(self, config, tamanho=TAMANHO_POOL, nome="macrofluxo"):
+        self.config = dict(config)
+        self.tamanho = tamanho
+        self.nome = nome
+
+        self._lock = threading.Lock()
+        self._pool = None
+        self._ultima_falha = None
+
+    def _obter_pool(self):
+        with self._lock:
+            if self._pool is not None:
+                return self._pool
+
+            if self._ultima_falha and time.monotonic() - self._ultima_falha < INTERVALO_NOVA_TENTATIVA_SEGUNDOS:
+                return None
+
+            try:
+                self._pool = pooling.MySQLConnectionPool(
+                    pool_name=self.nome,
+                    pool_size=self.tamanho,
+                    pool_reset_session=True,
+                    connection_timeout=TIMEOUT_CONEXAO_SEGUNDOS,
+                    **self.config,
+                )
+                self._ultima_falha = None
+                print(f"[MYSQL] Pool '{self.nome}' criado com {self.tamanho} conexões.")
+            except Error as e:
+                self._ultima_falha = time.monotonic()
+                print(f"❌ Erro ao criar o pool MySQL: {e}")
+            return self._pool
+
+    def _conectar_direto(self):
+        try:
+            return mysql.connector.connect(connection_timeout=TIMEOUT_CONEXAO_SEGUNDOS, **self.config)
+        except Error as e:
+            print(f"❌ Erro de Conexão MySQL: {e}")
+            return None
+
+    def obter_conexao(self):
+        pool = self._obter_pool()
+        if pool is None:
+            return None
+
+        try:
+            conn = pool.get_connection()
+        except PoolError:
+            print("[MYSQL] Pool esgotado. Abrindo conexão avulsa.")
+            return self._conectar_direto()
+        except Error as e:
+            print(f"❌ Erro ao obter conexão do pool: {e}")
+            return None
+
+        # Pré-ping: conexões ociosas podem ter sido encerradas pelo servidor
+        try:
+            conn.ping(reconnect=True, attempts=1, delay=0)
+            return conn
+        except Error as e:
+            print(f"❌ Conexão do pool inválida: {e}")
+            try:
+                conn.close()
+            except Error:
+                pass
+            return None
+
+    def verificar_saude(self):
+        """Retorna True se uma conexão do pool responde a SELECT 1."""
+        conn = self.obter_conexao()
+        if conn is None:
+            return False
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT 1")
+            cursor.fetchall()
+            cursor.close()
+            return True
+        except Error:
+            return False
+        finally:
+            conn.close()
+
+
+def obter_pool(config, tamanho=TAMANHO_POOL):
+    """Pool único por configuração de banco, compartilhado pelo processo."""
+    chave = tuple(sorted((k, str(v)) for k, v in config.items()))
+    with _POOLS_LOCK:
+        if chave not in _POOLS:
+            _POOLS[chave] = PoolMySQL(config, tamanho, nome=f"macrofluxo_{len(_POOLS)}")
+        return _POOLS[chave]
@@ -0,0 +1,89 @@
+# indice_filtros.py
+# Índice das colunas categóricas usadas nos filtros (UGB, Empreendimento,
+# GRUPO, SETOR, Etapa), montado uma vez por versão dos dados.
+#
+# Cada filtro da sidebar e do applyFiltersAndRedraw dos Gantts varria as
+# linhas comparando valores (isin / includes). Aqui cada coluna vira uma
+# codificação por dicionário: a lista de valores distintos e, por linha, o
+# código do seu valor. Uma seleção vira um bitmap de linhas em uma passada
+# (tabela de consulta indexada pelos códigos, sem comparar textos) e uma
+# combinação de filtros é o AND dos bitmaps.
+#
+# O mesmo formato vai para o navegador (para_cliente), alinhado às listas de
+# tarefas do payload; templates/gantt_indice_filtros.js monta os bitmaps lá.
+
+import numpy as np
+import pandas as pd
+
+
+class IndiceFiltros:
+    """Códigos por linha e valores distintos de cada coluna indexada."""
+
+    def __init__(self, n_linhas, codigos, valores):
+        # codigos: {coluna: np.int32 (-1 = vazio)}; valores: {coluna: np.ndarray de objetos}
+        self.n_linhas = n_linhas
+        self._codigos = codigos
+        self._valores = valores
+        self._posicao_valor = {coluna: {valor: i for i, valor in enumerate(vals)} for coluna, vals in valores.items()}
+
+    @classmethod
+    def de_series(cls, n_linhas, series):
+        """series: {coluna: Series ou sequência com n_linhas valores}."""
+        codigos, valores = {}, {}
+        for coluna, serie in series.items():
+            cod, uniq = pd.factorize(pd.Series(serie, dtype=object), sort=False)
+            codigos[coluna] = cod.astype(np.int32, copy=False)
+            valores[coluna] = np.asarray(uniq, dtype=object)
+        return cls(n_linhas, codigos, valores)
+
+    @classmethod
+    def do_dataframe(cls, df, colunas):
+        """Índice das colunas de df (as ausentes são ignoradas)."""
+        return cls.de_series(len(df), {coluna: df[coluna].to_numpy() for coluna in colunas if coluna in df.columns})
+
+    @classmethod
+    def das_tarefas(cls, tarefas, campos):
+        """Índice de uma lista de dicts (tarefas do Gantt), na ordem da lista."""
+        return cls.de_series(len(tarefas), {campo: [t.get(campo) for t in tarefas] for campo in campos})
+
+    def colunas(self):
+        return list(self._codigos)
+
+    def mascara(self, filtros):
+        """
+        Bitmap (np.bool_) das linhas que passam em todos os filtros. filtros:
+        {coluna: valores aceitos}; seleções vazias ou None são ignoradas e
+        valores que não existem na coluna não casam com nenhuma linha.
+        """
+        mascara = np.ones(self.n_linhas, dtype=bool)
+        for coluna, selecao in filtros.items():
+            if not selecao:
+                continue
+            posicao_valor = self._posicao_valor[coluna]
+            # Última posição = código -1 (valor vazio), nunca aceita
+            aceitos = np.zeros(len(posicao_valor) + 1, dtype=bool)
+            aceitos[[posicao_valor[v] for v in selecao if v in posicao_valor]] = True
+            mascara &= aceitos[self._codigos[coluna]]
+        return mascara
+
+    def posicoes(self, filtros):
+        """Posições (ordenadas) das linhas que passam nos filtros."""
+        return np.flatnonzero(self.mascara(filtros))
+
+    def valores(self, coluna, mascara=None):
+        """Valores distintos (não vazios) da coluna, ordenados; só das linhas da mascara se dada."""
+        codigos = self._codigos[coluna]
+        if mascara is not None:
+            codigos = codigos[mascara]
+        presentes = np.unique(codigos)
+        return sorted(self._valores[coluna][presentes[presentes >= 0]].tolist())
+
+    def para_cliente(self):
+        """{'n', 'colunas': {coluna: {'valores', 'codigos'}}} em tipos JSON, para o payload do Gantt."""
+        return {
+            "n": self.n_linhas,
+            "colunas": {
+                coluna: {"valores": self._valores[coluna].tolist(), "codigos": self._codigos[coluna].tolist()}
+                for coluna in self._codigos
+            },
+        }
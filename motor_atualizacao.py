@@ -0,0 +1,251 @@
+# motor_atualizacao.py
+# Motor de atualização incremental dos dados do Macrofluxo.
+#
+# Em vez de guardar o DataFrame para sempre e depender de um reboot periódico,
+# o motor acompanha a "versão" de cada fonte (planilha Excel e relatório do
+# Smartsheet) e só reconstrói os dados quando alguma delas mudou. A verificação
+# roda em segundo plano a cada TTL; enquanto a reconstrução acontece, os
+# usuários continuam recebendo o DataFrame anterior (a reconstrução roda fora
+# do lock; só a troca do DataFrame e da versão é feita sob ele). Se a
+# reconstrução falha (fonte fora do ar), o DataFrame e a versão anteriores são
+# mantidos e a falha é informada na próxima chamada a obter(), no thread do
+# script.
+
+import hashlib
+import os
+import threading
+import time
+import traceback
+
+# Configuração
+TTL_VERIFICACAO_SEGUNDOS = int(os.getenv("MACROFLUXO_TTL_SEGUNDOS", "600"))
+
+# Atributo (df.attrs) com as fontes que falharam numa construção parcial:
+# {posição da fonte na versão: mensagem}
+FONTES_COM_FALHA = "fontes_com_falha"
+
+# Cache de hashes: caminho -> ((mtime_ns, tamanho), sha256)
+_HASHES_ARQUIVOS = {}
+
+
+def assinatura_arquivo(caminho):
+    """
+    Retorna o hash SHA-256 do conteúdo do arquivo.
+    O hash só é recalculado quando o mtime ou o tamanho mudam, então um
+    arquivo salvo de novo sem alterações mantém a mesma assinatura.
+    """
+    if not caminho or not os.path.exists(caminho):
+        return "ausente"
+
+    stat = os.stat(caminho)
+    chave_stat = (stat.st_mtime_ns, stat.st_size)
+
+    em_cache = _HASHES_ARQUIVOS.get(caminho)
+    if em_cache and em_cache[0] == chave_stat:
+        return em_cache[1]
+
+    sha = hashlib.sha256()
+    with open(caminho, 'rb') as f:
+        for bloco in iter(lambda: f.read(1024 * 1024), b''):
+            sha.update(bloco)
+    digest = sha.hexdigest()
+
+    _HASHES_ARQUIVOS[caminho] = (chave_stat, digest)
+    return digest
+
+
+class MotorAtualizacao:
+    """
+    Mantém o DataFrame consolidado em memória e o reconstrói apenas quando a
+    versão das fontes muda.
+
+    - construir(): executa o pipeline completo e retorna o DataFrame.
+    - obter_versao(): retorna uma tupla com a versão de cada fonte. Cada fonte
+      é comparada sozinha: um item None significa "não foi possível
+      verificar" e não dispara reconstrução, mas também não impede que a
+      mudança de outra fonte a dispare.
+    - carregar_snapshot() / salvar_snapshot(df, versao): opcionais. Quando
+      informados, o primeiro acesso do processo lê o último snapshot em disco
+      (e verifica as fontes em segundo plano) e toda reconstrução é persistida.
+    - dados_reserva(): opcional. DataFrame servido (sem versão) quando a
+      primeira construção falha e ainda não há dados em memória.
+
+    construir() levanta uma exceção quando nenhuma fonte produziu dados: o
+    motor mantém então os dados anteriores. Se só algumas fontes falharam, o
+    DataFrame parcial é usado e df.attrs[FONTES_COM_FALHA] indica quais: a
+    versão delas fica None (são reconstruídas assim que a versão é conhecida)
+    e a falha é informada como erro.
+    """
+
+    def __init__(self, construir, obter_versao, ttl_segundos=TTL_VERIFICACAO_SEGUNDOS,
+                 carregar_snapshot=None, salvar_snapshot=None, dados_reserva=None):
+        self._construir = construir
+        self._obter_versao = obter_versao
+        self.ttl_segundos = ttl_segundos
+        self._carregar_snapshot = carregar_snapshot
+        self._salvar_snapshot = salvar_snapshot
+        self._dados_reserva = dados_reserva
+
+        self._lock = threading.Lock()
+        # Uma reconstrução por vez (segundo plano x forcar_atualizacao)
+        self._lock_reconstrucao = threading.Lock()
+        self._df = None
+        self._versao = None
+        self._ultima_verificacao = 0.0
+        self._atualizando = False
+        self._erro = None
+
+    @property
+    def versao(self):
+        return self._versao
+
+    @property
+    def erro(self):
+        """Mensagem da última reconstrução que falhou, total ou parcialmente (None após um sucesso)."""
+        return self._erro
+
+    def obter(self, avisar_falha=None):
+        """
+        Retorna o DataFrame atual. Na primeira chamada os dados vêm do snapshot
+        em disco ou, sem snapshot, de uma construção síncrona; depois disso, se o TTL expirou, dispara uma verificação em segundo plano
+        e devolve imediatamente os dados que já estão em memória.
+
+        avisar_falha(mensagem): chamada aqui, no thread de quem pediu os
+        dados, se a última reconstrução falhou (os dados são os anteriores).
+        """
+        if self._df is None:
+            self._carregar_primeira_vez()
+
+        with self._lock:
+            if self._ttl_expirado() and not self._atualizando:
+                self._atualizando = True
+                threading.Thread(
+                    target=self._atualizar_em_segundo_plano,
+                    name="macrofluxo-atualizacao",
+                    daemon=True,
+                ).start()
+            df, erro = self._df, self._erro
+
+        if erro and avisar_falha:
+            avisar_falha(erro)
+        return df
+
+    def forcar_atualizacao(self):
+        """Reconstrói os dados imediatamente, independente da versão."""
+        self._atualizar(forcar=True)
+        return self._df
+
+    def _carregar_primeira_vez(self):
+        """
+        Snapshot ou construção síncrona. Sessões que chegam durante a carga
+        esperam por ela (lock de reconstrução) e usam o resultado.
+        """
+        with self._lock_reconstrucao:
+            if self._df is not None:
+                return
+            if self._iniciar_do_snapshot():
+                return
+            self._reconstruir_se_mudou(forcar=True)
+            if self._df is None and self._dados_reserva:
+                df_reserva = self._dados_reserva()
+                with self._lock:
+                    self._df = df_reserva
+
+    def _iniciar_do_snapshot(self):
+        """
+        Carrega o último snapshot em disco, se houver. A verificação das fontes
+        fica pendente (TTL expirado) e roda em segundo plano logo em seguida.
+        """
+        if not self._carregar_snapshot:
+            return False
+
+        inicio = time.perf_counter()
+        df, versao = self._carregar_snapshot()
+        if df is None:
+            return False
+
+        with self._lock:
+            self._df = df
+            self._versao = versao
+            self._ultima_verificacao = 0.0
+            self._atualizando = True
+        print(f"[ATUALIZACAO] Dados carregados do snapshot em {(time.perf_counter() - inicio) * 1000:.0f}ms (versão: {versao})")
+
+        threading.Thread(
+            target=self._atualizar_em_segundo_plano,
+            name="macrofluxo-atualizacao",
+            daemon=True,
+        ).start()
+        return True
+
+    def _ttl_expirado(self):
+        return (time.monotonic() - self._ultima_verificacao) >= self.ttl_segundos
+
+    def _atualizar_em_segundo_plano(self):
+        try:
+            self._atualizar(forcar=False)
+        except Exception as e:
+            print(f"[ATUALIZACAO] Erro na atualização em segundo plano: {e}")
+            traceback.print_exc()
+        finally:
+            self._atualizando = False
+
+    def _atualizar(self, forcar):
+        with self._lock_reconstrucao:
+            self._reconstruir_se_mudou(forcar)
+
+    def _versao_mudou(self, versao):
+        """Alguma fonte de versão conhecida difere da versão dos dados atuais?"""
+        if versao is None:
+            return False
+        anterior = self._versao or (None,) * len(versao)
+        return any(nova is not None and nova != atual for nova, atual in zip(versao, anterior))
+
+    def _reconstruir_se_mudou(self, forcar):
+        try:
+            versao = self._obter_versao()
+        except Exception as e:
+            print(f"[ATUALIZACAO] Falha ao verificar a versão das fontes: {e}")
+            versao = None
+
+        if not forcar and not self._versao_mudou(versao):
+            if versao is None or None in versao:
+                print(f"[ATUALIZACAO] Versão de alguma fonte indisponível ({versao}). Nenhuma outra mudou; mantendo os dados atuais.")
+            self._ultima_verificacao = time.monotonic()
+            return
+
+        print(f"[ATUALIZACAO] Reconstruindo dados (versão anterior: {self._versao}, nova: {versao})")
+        inicio = time.perf_counter()
+        try:
+            df_novo = self._construir()
+        except Exception as e:
+            # Mantém os dados e a versão anteriores; a próxima tentativa só
+            # acontece quando o TTL expirar de novo
+            print(f"[ATUALIZACAO] Falha ao reconstruir os dados: {e}. Mantendo os dados atuais.")
+            traceback.print_exc()
+            with self._lock:
+                self._erro = str(e)
+                self._ultima_verificacao = time.monotonic()
+            return
+
+        # Fontes que falharam ficam sem versão: a próxima verificação com a
+        # versão delas conhecida reconstrói os dados
+        falhas = df_novo.attrs.get(FONTES_COM_FALHA) or {}
+        if versao is not None:
+            versao = tuple(None if i in falhas else parte for i, parte in enumerate(versao))
+        if falhas:
+            print(f"[ATUALIZACAO] Dados parciais; fontes com falha: {falhas}")
+
+        # Só a troca fica sob o lock: quem já pegou o DataFrame antigo
+        # continua com ele, as próximas chamadas recebem o novo.
+        with self._lock:
+            self._df = df_novo
+            self._versao = versao
+            self._erro = "; ".join(falhas.values()) or None
+            self._ultima_verificacao = time.monotonic()
+        print(f"[ATUALIZACAO] Dados reconstruídos em {time.perf_counter() - inicio:.1f}s")
+
+        # Só persiste dados de versão conhecida em todas as fontes, senão o
+        # próximo boot não teria como saber se o snapshot ainda vale.
+        if self._salvar_snapshot and versao is not None and None not in versao:
+            self._salvar_snapshot(df_novo, versao)
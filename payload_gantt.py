@@ -0,0 +1,276 @@
+# payload_gantt.py
+# Dados dos gráficos de Gantt servidos fora do HTML do componente.
+#
+# O HTML do Gantt tem milhares de linhas de CSS/JS e antes levava junto, em
+# json.dumps, todas as tarefas, baselines e opções de filtro; a cada rerun o
+# Streamlit reenviava tudo ao navegador. Agora os dados viram um arquivo JSON
+# (mais uma cópia gzip) em static/gantt_dados/, nomeado pelo hash do conteúdo,
+# e o HTML leva só um carregador com a URL. Dados iguais geram a mesma URL,
+# então o navegador reaproveita o cache HTTP e só baixa de novo quando os dados
+# mudam.
+#
+# O HTML de cada visão também pode ser publicado ali (<versao>.html), para o
+# componente_gantt buscá-lo pela URL em vez de recebê-lo a cada rerun.
+#
+# Requer server.enableStaticServing = true (.streamlit/config.toml). Sem ele o
+# carregador recebe os dados embutidos no próprio HTML, como antes.
+
+import gzip
+import hashlib
+import json
+import math
+import os
+import tempfile
+
+PASTA_STATIC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+SUBPASTA_PAYLOADS = "gantt_dados"
+PASTA_PAYLOADS = os.path.join(PASTA_STATIC, SUBPASTA_PAYLOADS)
+# Quantos payloads manter em disco (os mais antigos são apagados)
+MAX_PAYLOADS = 64
+NIVEL_GZIP = 6
+
+# Scripts com este type só executam depois que os dados chegam
+TIPO_SCRIPT_ADIADO = "text/gantt-adiado"
+
+# JSON não tem NaN/Infinity (o literal JS embutido antes tinha): esses valores
+# viajam como texto e o carregador os converte de volta
+PREFIXO_NAO_FINITO = "__gantt_float__:"
+
+_CARREGADOR_JS = """
+<script>
+(function () {
+    const config = __CONFIG__;
+
+    function executarScriptsAdiados() {
+        document.querySelectorAll('script[type="__TIPO_ADIADO__"]').forEach(function (adiado) {
+            const script = document.createElement('script');
+            script.textContent = adiado.textContent;
+            adiado.replaceWith(script);
+        });
+    }
+
+    function avisarComponente(estado) {
+        // O componente_gantt só exibe o documento novo quando ele fica pronto
+        if (window.parent !== window) window.parent.postMessage({ gantt: estado, versao: config.versao }, '*');
+    }
+
+    function interpretar(texto) {
+        if (!config.nao_finitos) return JSON.parse(texto);
+        const prefixo = '__PREFIXO__';
+        return JSON.parse(texto, function (chave, valor) {
+            return (typeof valor === 'string' && valor.startsWith(prefixo)) ? Number(valor.slice(prefixo.length)) : valor;
+        });
+    }
+
+    async function carregarDados() {
+        if (config.inline) {
+            return interpretar(document.getElementById('gantt-dados-inline').textContent);
+        }
+        if (typeof DecompressionStream !== 'undefined') {
+            const resposta = await fetch(config.url_gz);
+            if (!resposta.ok) throw new Error('HTTP ' + resposta.status + ' em ' + config.url_gz);
+            const fluxo = resposta.body.pipeThrough(new DecompressionStream('gzip'));
+            return interpretar(await new Response(fluxo).text());
+        }
+        const resposta = await fetch(config.url_json);
+        if (!resposta.ok) throw new Error('HTTP ' + resposta.status + ' em ' + config.url_json);
+        return interpretar(await resposta.text());
+    }
+
+    async function buscarTexto(url, integridade) {
+        // integrity: o navegador confere o hash (SRI) antes de entregar o conteúdo
+        const resposta = await fetch(url, integridade ? { integrity: integridade } : {});
+        if (!resposta.ok) throw new Error('HTTP ' + resposta.status + ' em ' + url);
+        return resposta.text();
+    }
+
+    async function buscarAsset(asset) {
+        if (asset.conteudo !== undefined) return asset.conteudo;
+        if (!asset.url) {
+            throw new Error(asset.arquivo + ' sem URL nem conteúdo (ver assets_gantt.descrever_assets)');
+        }
+        return buscarTexto(asset.url, asset.integridade);
+    }
+
+    function instalarAssets(textos) {
+        // CSS antes dos estilos do template (que o sobrescrevem), JS no fim do <head>
+        const ancora = document.head.firstChild;
+        config.assets.forEach(function (asset, i) {
+            const elemento = document.createElement(asset.tipo === 'css' ? 'style' : 'script');
+            elemento.textContent = textos[i];
+            if (asset.tipo === 'css') document.head.insertBefore(elemento, ancora);
+            else document.head.appendChild(elemento);
+        });
+    }
+
+    Promise.all([carregarDados(), Promise.all(config.assets.map(buscarAsset))]).then(function (resultados) {
+        instalarAssets(resultados[1]);
+        window.GANTT_DADOS = resultados[0];
+        executarScriptsAdiados();
+        avisarComponente('pronto');
+    }).catch(function (erro) {
+        console.error('[GANTT] Falha ao carregar os dados (versão ' + config.versao + '):', erro);
+        document.body.insertAdjacentHTML('afterbegin',
+            '<div style="padding: 20px; text-align: center; color: #b91c1c;">' +
+            'Não foi possível carregar os dados do gráfico. Recarregue a página.</div>');
+        avisarComponente('erro');
+    });
+})();
+</script>
+"""
+
+
+def _trocar_nao_finitos(valor):
+    if isinstance(valor, float) and not math.isfinite(valor):
+        return PREFIXO_NAO_FINITO + json.dumps(valor)
+    if isinstance(valor, dict):
+        return {chave: _trocar_nao_finitos(v) for chave, v in valor.items()}
+    if isinstance(valor, (list, tuple)):
+        return [_trocar_nao_finitos(v) for v in valor]
+    return valor
+
+
+def serializar(dados):
+    """
+    JSON compacto (UTF-8) dos dados do Gantt. Retorna (conteudo, nao_finitos);
+    nao_finitos indica que há NaN/Infinity codificados com PREFIXO_NAO_FINITO.
+    """
+    try:
+        return json.dumps(dados, ensure_ascii=False, separators=(",", ":"), allow_nan=False).encode("utf-8"), False
+    except ValueError:
+        dados = _trocar_nao_finitos(dados)
+        return json.dumps(dados, ensure_ascii=False, separators=(",", ":")).encode("utf-8"), True
+
+
+def versao_dados(conteudo):
+    """Hash curto do conteúdo serializado; é o nome do arquivo e a chave de cache."""
+    return hashlib.sha256(conteudo).hexdigest()[:16]
+
+
+def _gravar_atomico(caminho, conteudo):
+    # Vários reruns (threads) podem gravar o mesmo payload ao mesmo tempo
+    fd, temporario = tempfile.mkstemp(dir=os.path.dirname(caminho), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as arquivo:
+            arquivo.write(conteudo)
+        os.chmod(temporario, 0o644)
+        os.replace(temporario, caminho)
+    except OSError:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        raise
+
+
+def _limpar_antigos(pasta, manter=MAX_PAYLOADS, extensao=".json"):
+    arquivos = [os.path.join(pasta, nome) for nome in os.listdir(pasta) if nome.endswith(extensao)]
+    if len(arquivos) <= manter:
+        return
+    arquivos.sort(key=os.path.getmtime)
+    for caminho in arquivos[:-manter]:
+        for alvo in (caminho, caminho + ".gz"):
+            try:
+                os.remove(alvo)
+            except OSError:
+                pass
+
+
+def url_estatico(caminho_relativo, base_url=""):
+    """
+    URL de um arquivo de static/ (caminho relativo com "/") servido pelo
+    Streamlit. base_url é o server.baseUrlPath (vazio na raiz).
+    """
+    prefixo = "/" + (base_url.strip("/") + "/" if base_url.strip("/") else "")
+    return f"{prefixo}app/static/{caminho_relativo}"
+
+
+def publicar_payload(dados, base_url=""):
+    """
+    Grava os dados em static/gantt_dados/<versao>.json(.gz), se ainda não
+    existirem, e retorna {'versao', 'url_json', 'url_gz', 'bytes', 'bytes_gz',
+    'nao_finitos'}.
+
+    base_url é o server.baseUrlPath do Streamlit (vazio na raiz).
+    """
+    conteudo, nao_finitos = serializar(dados)
+    versao = versao_dados(conteudo)
+
+    os.makedirs(PASTA_PAYLOADS, exist_ok=True)
+    caminho_json = os.path.join(PASTA_PAYLOADS, f"{versao}.json")
+    caminho_gz = caminho_json + ".gz"
+
+    if os.path.exists(caminho_json) and os.path.exists(caminho_gz):
+        # Marca como usado recentemente para a limpeza
+        os.utime(caminho_json)
+    else:
+        conteudo_gz = gzip.compress(conteudo, compresslevel=NIVEL_GZIP, mtime=0)
+        _gravar_atomico(caminho_gz, conteudo_gz)
+        _gravar_atomico(caminho_json, conteudo)
+        print(f"[GANTT] Payload {versao} publicado: {len(conteudo) / 1024:.0f} KB "
+              f"({len(conteudo_gz) / 1024:.0f} KB gzip).")
+        _limpar_antigos(PASTA_PAYLOADS)
+
+    url = url_estatico(f"{SUBPASTA_PAYLOADS}/{versao}.json", base_url)
+    return {
+        "versao": versao,
+        # ?v= faz o servidor estático responder com cache longo
+        "url_json": f"{url}?v={versao}",
+        "url_gz": f"{url}.gz?v={versao}",
+        "bytes": len(conteudo),
+        "bytes_gz": os.path.getsize(caminho_gz),
+        "nao_finitos": nao_finitos,
+    }
+
+
+def publicar_documento(html, base_url=""):
+    """
+    Grava o HTML de um Gantt em static/gantt_dados/<versao>.html, se ainda não
+    existir, e retorna {'versao', 'url'}.
+    """
+    conteudo = html.encode("utf-8")
+    versao = versao_dados(conteudo)
+
+    os.makedirs(PASTA_PAYLOADS, exist_ok=True)
+    caminho = os.path.join(PASTA_PAYLOADS, f"{versao}.html")
+    if os.path.exists(caminho):
+        os.utime(caminho)
+    else:
+        _gravar_atomico(caminho, conteudo)
+        _limpar_antigos(PASTA_PAYLOADS, extensao=".html")
+
+    url = url_estatico(f"{SUBPASTA_PAYLOADS}/{versao}.html", base_url)
+    return {"versao": versao, "url": f"{url}?v={versao}"}
+
+
+def html_carregador(dados, base_url="", servir_estatico=True, assets=()):
+    """
+    Bloco <script> que carrega os dados em window.GANTT_DADOS e, em seguida,
+    executa os scripts do Gantt marcados com type=TIPO_SCRIPT_ADIADO.
+
+    Com servir_estatico=False (servidor sem arquivos estáticos) os dados vão
+    embutidos no HTML.
+
+    assets: CSS/JS de terceiros a carregar antes dos scripts do Gantt, no
+    formato de assets_gantt.descrever_assets (por URL ou embutidos).
+
+    Retorna (html, chave): chave identifica o carregador (versão dos dados e
+    configuração, sem os dados embutidos) e serve de chave de cache do HTML
+    final em templates_gantt.renderizar.
+    """
+    if servir_estatico:
+        config = publicar_payload(dados, base_url)
+        config["inline"] = False
+        embutido = ""
+    else:
+        conteudo, nao_finitos = serializar(dados)
+        config = {"versao": versao_dados(conteudo), "inline": True, "nao_finitos": nao_finitos}
+        texto = conteudo.decode("utf-8").replace("</", "<\\/")
+        embutido = f'<script id="gantt-dados-inline" type="application/json">{texto}</script>'
+
+    config["assets"] = list(assets)
+    config_json = json.dumps(config)
+    # Os assets embutidos (servir_estatico=False) podem conter "</script>"
+    carregador = (_CARREGADOR_JS
+                  .replace("__CONFIG__", config_json.replace("</", "<\\/"))
+                  .replace("__TIPO_ADIADO__", TIPO_SCRIPT_ADIADO)
+                  .replace("__PREFIXO__", PREFIXO_NAO_FINITO))
+    return embutido + carregador, versao_dados(config_json.encode("utf-8"))
@@ -0,0 +1,149 @@
+# snapshot_dados.py
+# Snapshot local (Parquet) do DataFrame consolidado produzido pelo load_data.
+#
+# O app grava o resultado do pipeline em disco junto com a versão das fontes
+# que o gerou. Num cold start o snapshot é lido em milissegundos e o pipeline
+# completo (download do Smartsheet + leitura do Excel) só roda se as fontes
+# mudaram desde então.
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+# Configuração
+DIRETORIO_CACHE = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache_macrofluxo")
+ARQUIVO_MANIFESTO = "manifesto_snapshot.json"
+PREFIXO_SNAPSHOT = "df_merged-"
+
+# Incrementar sempre que o formato do DataFrame consolidado mudar,
+# para invalidar snapshots gravados por versões anteriores do app.
+VERSAO_ESQUEMA = 1
+
+COLUNAS_DATA = ["Inicio_Prevista", "Termino_Prevista", "Inicio_Real", "Termino_Real"]
+COLUNAS_CATEGORIA = ["UGB", "Empreendimento", "Etapa", "SETOR", "GRUPO"]
+
+
+def tipar_dados(df):
+    """
+    Converte as colunas de data para datetime64 e o percentual para float.
+    Aplicado tanto no pipeline quanto na leitura do snapshot, para que as
+    duas origens entreguem exatamente o mesmo DataFrame ao app.
+    """
+    df = df.copy()
+    for col in COLUNAS_DATA:
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col], errors='coerce')
+    if "% concluído" in df.columns:
+        df["% concluído"] = pd.to_numeric(df["% concluído"], errors='coerce').fillna(0.0)
+    return df
+
+
+def escrever_atomico(caminho, escrever):
+    """
+    Grava um arquivo de forma atômica: escreve num temporário no mesmo
+    diretório e renomeia por cima do destino.
+    """
+    diretorio = os.path.dirname(caminho)
+    os.makedirs(diretorio, exist_ok=True)
+    fd, caminho_tmp = tempfile.mkstemp(dir=diretorio, prefix=".tmp-")
+    os.close(fd)
+    try:
+        escrever(caminho_tmp)
+        os.replace(caminho_tmp, caminho)
+    finally:
+        if os.path.exists(caminho_tmp):
+            os.remove(caminho_tmp)
+
+
+def _nome_arquivo(versao):
+    chave = hashlib.sha1(json.dumps(list(versao)).encode('utf-8')).hexdigest()[:16]
+    return f"{PREFIXO_SNAPSHOT}{chave}.parquet"
+
+
+def salvar_snapshot(df, versao, diretorio=DIRETORIO_CACHE):
+    """
+    Grava o DataFrame consolidado e o manifesto com a versão das fontes.
+    Falhas são apenas registradas: o snapshot é uma otimização.
+    """
+    try:
+        nome_arquivo = _nome_arquivo(versao)
+        caminho_arquivo = os.path.join(diretorio, nome_arquivo)
+
+        # No disco as colunas de texto repetitivas ficam como categoria
+        # (dicionário no Parquet), o que reduz o arquivo e acelera a leitura.
+        df_disco = tipar_dados(df)
+        for col in COLUNAS_CATEGORIA:
+            if col in df_disco.columns:
+                df_disco[col] = df_disco[col].astype("category")
+
+        escrever_atomico(caminho_arquivo, lambda tmp: df_disco.to_parquet(tmp, index=False))
+
+        manifesto = {
+            "versao_esquema": VERSAO_ESQUEMA,
+            "versao_fontes": list(versao),
+            "arquivo": nome_arquivo,
+            "attrs": df.attrs,
+            "criado_em": time.strftime("%Y-%m-%d %H:%M:%S"),
+        }
+
+        def escrever_manifesto(tmp):
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(manifesto, f, ensure_ascii=False, default=str)
+
+        escrever_atomico(os.path.join(diretorio, ARQUIVO_MANIFESTO), escrever_manifesto)
+
+        # Remove snapshots de versões anteriores
+        for nome in os.listdir(diretorio):
+            if nome.startswith(PREFIXO_SNAPSHOT) and nome != nome_arquivo:
+                try:
+                    os.remove(os.path.join(diretorio, nome))
+                except OSError:
+                    pass
+
+        print(f"[SNAPSHOT] Snapshot salvo: {nome_arquivo} ({len(df)} linhas)")
+        return True
+
+    except ImportError as e:
+        print(f"[SNAPSHOT] Parquet indisponível (instale pyarrow): {e}")
+        return False
+    except Exception as e:
+        print(f"[SNAPSHOT] Falha ao salvar snapshot: {e}")
+        return False
+
+
+def carregar_snapshot(diretorio=DIRETORIO_CACHE):
+    """
+    Lê o último snapshot gravado.
+    Retorna (DataFrame, versao_fontes) ou (None, None) se não houver snapshot válido.
+    """
+    caminho_manifesto = os.path.join(diretorio, ARQUIVO_MANIFESTO)
+    if not os.path.exists(caminho_manifesto):
+        return None, None
+
+    try:
+        with open(caminho_manifesto, 'r', encoding='utf-8') as f:
+            manifesto = json.load(f)
+
+        if manifesto.get("versao_esquema") != VERSAO_ESQUEMA:
+            print("[SNAPSHOT] Snapshot de um esquema anterior. Ignorando.")
+            return None, None
+
+        df = pd.read_parquet(os.path.join(diretorio, manifesto["arquivo"]))
+
+        # Em memória as categorias voltam a ser texto: os agrupamentos do app
+        # (groupby sem observed=True) gerariam todas as combinações de categorias.
+        for col in COLUNAS_CATEGORIA:
+            if col in df.columns and isinstance(df[col].dtype, pd.CategoricalDtype):
+                df[col] = df[col].astype(object)
+
+        df = tipar_dados(df)
+        df.attrs.update(manifesto.get("attrs", {}))
+        return df, tuple(manifesto["versao_fontes"])
+
+    except Exception as e:
+        print(f"[SNAPSHOT] Falha ao ler snapshot: {e}")
+        return None, None
@@ -0,0 +1,176 @@
+# tabela_detalhada.py
+# HTML da "Visão Detalhada por Empreendimento" (abaixo do Gantt) em uma passada.
+#
+# A tabela era montada com um DataFrame de cabeçalho por empreendimento mais
+# uma cópia do grupo, concatenados e estilizados com Styler.apply(axis=1): uma
+# função Python por linha, que reinterpretava datas e textos, antes do
+# to_html. Aqui os textos e as cores de cada coluna são calculados de uma vez
+# sobre os arrays agregados (linhas de etapa e cabeçalhos de empreendimento) e
+# o HTML é escrito em um único laço. O app guarda o resultado em cache por
+# versão dos dados e filtros.
+
+import html
+
+import numpy as np
+
+# (coluna agregada, título) das datas, na ordem da tabela
+COLUNAS_DATAS = [
+    ("Inicio_Prevista", "Início Prev."),
+    ("Termino_Prevista", "Término Prev."),
+    ("Inicio_Real", "Início Real"),
+    ("Termino_Real", "Término Real"),
+]
+COLUNAS_COM_STATUS = ("Inicio_Real", "Termino_Real")
+
+ESTILO_TABELA = (
+    "<style>"
+    ".tabela-detalhada td { white-space: nowrap; text-overflow: ellipsis; overflow: hidden; max-width: 380px; }"
+    "</style>"
+)
+ESTILO_CABECALHO_EMP = (
+    "font-weight: 500; color: #000000; background-color: #F0F2F6; "
+    "border-left: 4px solid #000000; padding-left: 10px;"
+)
+ESTILO_CABECALHO_EMP_DEMAIS = "background-color: #F0F2F6;"
+RECUO_ETAPA = " &nbsp; &nbsp; "
+
+
+def _textos_datas(serie):
+    return serie.dt.strftime("%d/%m/%Y").where(serie.notna(), "-").to_numpy(dtype=object)
+
+
+def _textos_percentual(serie):
+    inteiros = serie.fillna(0).astype(np.int64).astype(str) + "%"
+    return inteiros.where(serie.notna(), "-").to_numpy(dtype=object)
+
+
+def _textos_variacao(serie):
+    valores = serie.to_numpy(dtype=float)
+    validos = ~np.isnan(valores)
+    dias = np.abs(np.trunc(np.where(validos, valores, 0))).astype(np.int64).astype(str)
+    textos = np.where(valores > 0, "▼ ", "▲ ").astype(object) + dias.astype(object) + " dias"
+    return np.where(validos, textos, "-")
+
+
+def _estilos_variacao(serie):
+    valores = serie.to_numpy(dtype=float)
+    estilos = np.where(
+        valores < 0,
+        "color: #e74c3c; font-weight: 600; font-size: 12px; text-align: center;",
+        "color: #2ecc71; font-weight: 600; font-size: 12px; text-align: center;",
+    ).astype(object)
+    return np.where(np.isnan(valores), "", estilos)
+
+
+def _cores_status(df, hoje):
+    """Cor de Início/Término Real de cada linha de etapa."""
+    concluida = (df["Percentual_Concluido"] == 100).to_numpy()
+    termino_real = df["Termino_Real"]
+    termino_previsto = df["Termino_Prevista"]
+    return np.select(
+        [
+            concluida & (termino_real < termino_previsto).to_numpy(),
+            concluida & (termino_real > termino_previsto).to_numpy(),
+            # Datas sem hora: "antes de agora" é o mesmo que "até hoje"
+            ~concluida & (termino_previsto <= hoje).to_numpy(),
+        ],
+        ["color: #2EAF5B;", "color: #C30202;", "color: #A38408;"],
+        default="color: #000000;",
+    ).astype(object)
+
+
+def _colunas_formatadas(df):
+    colunas = [_textos_percentual(df["Percentual_Concluido"])]
+    colunas += [_textos_datas(df[coluna]) for coluna, _ in COLUNAS_DATAS]
+    colunas.append(_textos_variacao(df["Var. Term"]))
+    return colunas
+
+
+def _linha(celulas, estilos):
+    partes = ["<tr>"]
+    for texto, estilo in zip(celulas, estilos):
+        partes.append(f'<td style="{estilo}">{texto}</td>' if estilo else f"<td>{texto}</td>")
+    partes.append("</tr>")
+    return "".join(partes)
+
+
+def _cabecalho(titulos):
+    return "<thead><tr>" + "".join(f"<th>{titulo}</th>" for titulo in titulos) + "</tr></thead>"
+
+
+def renderizar(df_ordenado, nomes_etapas, hoje):
+    """
+    HTML da tabela a partir de df_ordenado: uma linha por (Empreendimento,
+    Etapa) na ordem de exibição, com Percentual_Concluido (0-100), as datas,
+    Var. Term e ordem_empreendimento (categórica pela ordem dos
+    empreendimentos). nomes_etapas mapeia sigla -> nome completo.
+
+    Com uma única etapa a tabela é horizontal (Empreendimento, Etapa); com
+    várias, cada empreendimento tem uma linha de cabeçalho com o resumo das
+    suas etapas. Retorna "" se não houver linhas.
+    """
+    layout_horizontal = df_ordenado["Etapa"].nunique() == 1
+    if not layout_horizontal:
+        # Empreendimentos fora da ordenação não formam grupo (como no groupby anterior)
+        df_ordenado = df_ordenado[df_ordenado["ordem_empreendimento"].notna()]
+    if df_ordenado.empty:
+        return ""
+
+    nomes = df_ordenado["Etapa"].map(nomes_etapas)
+    textos = _colunas_formatadas(df_ordenado)
+    cores = _cores_status(df_ordenado, hoje)
+    estilos = [np.full(len(df_ordenado), "", dtype=object)] + [
+        cores if coluna in COLUNAS_COM_STATUS else np.full(len(df_ordenado), "", dtype=object)
+        for coluna, _ in COLUNAS_DATAS
+    ] + [_estilos_variacao(df_ordenado["Var. Term"])]
+    titulos_dados = ["% Concluído"] + [titulo for _, titulo in COLUNAS_DATAS] + ["Var. Term"]
+
+    linhas = []
+    if layout_horizontal:
+        empreendimentos = [html.escape(str(emp)) for emp in df_ordenado["Empreendimento"]]
+        etapas = [html.escape(nome) if isinstance(nome, str) else "-" for nome in nomes]
+        titulos = ["Empreendimento", "Etapa"] + titulos_dados
+        for i in range(len(df_ordenado)):
+            linhas.append(_linha(
+                [empreendimentos[i], etapas[i]] + [coluna[i] for coluna in textos],
+                ["", ""] + [coluna[i] for coluna in estilos],
+            ))
+    else:
+        etapas = [RECUO_ETAPA + html.escape(nome) if isinstance(nome, str) else "-" for nome in nomes]
+        titulos = ["Empreendimento / Etapa"] + titulos_dados
+
+        # Resumo de cada empreendimento, na ordem em que aparecem
+        grupos = df_ordenado.groupby("ordem_empreendimento", sort=False, observed=True)
+        resumo = grupos.agg(
+            Empreendimento=("Empreendimento", "first"),
+            Percentual_Concluido=("Percentual_Concluido", "mean"),
+            Inicio_Prevista=("Inicio_Prevista", "min"),
+            Termino_Prevista=("Termino_Prevista", "max"),
+            Inicio_Real=("Inicio_Real", "min"),
+            Termino_Real=("Termino_Real", "max"),
+        )
+        resumo["Var. Term"] = grupos["Var. Term"].mean()
+        textos_resumo = _colunas_formatadas(resumo)
+        estilos_resumo = [ESTILO_CABECALHO_EMP] + [ESTILO_CABECALHO_EMP_DEMAIS] * len(titulos_dados)
+        tamanhos = grupos.size().reindex(resumo.index).to_numpy()
+
+        # As etapas de cada empreendimento são contíguas em df_ordenado
+        inicio = 0
+        for g, (emp, tamanho) in enumerate(zip(resumo["Empreendimento"], tamanhos)):
+            linhas.append(_linha(
+                [f"📂 {html.escape(str(emp))}"] + [coluna[g] for coluna in textos_resumo],
+                estilos_resumo,
+            ))
+            for i in range(inicio, inicio + tamanho):
+                linhas.append(_linha(
+                    [etapas[i]] + [coluna[i] for coluna in textos],
+                    [""] + [coluna[i] for coluna in estilos],
+                ))
+            inicio += tamanho
+
+    return (
+        ESTILO_TABELA
+        + '<table class="tabela-detalhada">'
+        + _cabecalho(titulos)
+        + "<tbody>" + "".join(linhas) + "</tbody></table>"
+    )
@@ -0,0 +1,240 @@
+// gantt_camada_canvas.js
+// Camada de barras do Gantt desenhada em um único <canvas>.
+//
+// Acima de LIMIAR_BARRAS_CANVAS tasks, as visões consolidada e por setor
+// trocam as barras em DOM (um <div> por barra, com listeners próprios) por
+// esta camada: barras, hachura de sobreposição, divisores de mês e linha de
+// hoje são desenhados só para a área visível, a cada rolagem, em um quadro.
+// O canvas fica dentro do corpo do gráfico, acompanhando a rolagem; um
+// espaçador mantém a altura total para a rolagem e a sincronização com a
+// sidebar. O tooltip e o modo foco usam hit-test pela linha e posição x.
+//
+// Uso:
+//   const camada = new CamadaBarrasCanvas(elementoComRolagem, {
+//       barrasDaLinha: (item, indice) => [{ left, width, cor, rotulo, corRotulo, tipo, hachura }],
+//       linhasVerticais: () => [{ x, cor }],
+//       mostrarTooltip: (evento, item, tipo) => ..., esconderTooltip: () => ...,
+//       modoFoco: () => false,
+//   });
+//   camada.definirItens(itens, container);
+//
+// barrasDaLinha retorna as barras na ordem de pintura (a última fica por cima)
+// e em coordenadas do corpo do gráfico, como o left/width das barras em DOM.
+
+const LIMIAR_BARRAS_CANVAS = 1000;
+
+class CamadaBarrasCanvas {
+    constructor(rolagem, opcoes) {
+        this.rolagem = rolagem;
+        this.opcoes = opcoes;
+        this.alturaLinha = opcoes.alturaLinha || 30;
+        this.topoBarra = opcoes.topoBarra !== undefined ? opcoes.topoBarra : 8;
+        this.alturaBarra = opcoes.alturaBarra || 14;
+
+        this.container = null;
+        this.itens = [];
+        this.verticais = [];
+        // Barras destacadas no modo foco ("indice:tipo")
+        this.focadas = new Set();
+        this.area = { x: 0, y: 0, largura: 0, altura: 0 };
+        this.quadroAgendado = false;
+        this.hachura = null;
+        this.fonte = null;
+
+        this.espaco = document.createElement('div');
+        this.canvas = document.createElement('canvas');
+        this.canvas.className = 'camada-barras-canvas';
+        this.canvas.style.position = 'absolute';
+        this.canvas.style.zIndex = '6';
+        this.contexto = this.canvas.getContext('2d');
+
+        const agendar = () => this.agendar();
+        rolagem.addEventListener('scroll', agendar, { passive: true });
+        window.addEventListener('resize', agendar);
+        if (typeof ResizeObserver !== 'undefined') new ResizeObserver(agendar).observe(rolagem);
+
+        this.canvas.addEventListener('mousemove', e => this.aoMoverMouse(e));
+        this.canvas.addEventListener('mouseleave', () => {
+            this.canvas.style.cursor = '';
+            if (this.opcoes.esconderTooltip) this.opcoes.esconderTooltip();
+        });
+        this.canvas.addEventListener('click', e => this.aoClicar(e));
+    }
+
+    ativa() {
+        return this.container !== null && this.canvas.parentNode === this.container;
+    }
+
+    definirItens(itens, container) {
+        this.container = container;
+        this.itens = itens || [];
+        this.focadas.clear();
+        this.verticais = this.opcoes.linhasVerticais ? this.opcoes.linhasVerticais() : [];
+        this.espaco.style.height = (this.itens.length * this.alturaLinha) + 'px';
+        if (this.espaco.parentNode !== container) container.append(this.espaco);
+        if (this.canvas.parentNode !== container) container.append(this.canvas);
+        this.desenhar();
+    }
+
+    limparFoco() {
+        this.focadas.clear();
+        this.desenhar();
+    }
+
+    agendar() {
+        if (this.quadroAgendado || !this.ativa()) return;
+        this.quadroAgendado = true;
+        requestAnimationFrame(() => {
+            this.quadroAgendado = false;
+            this.desenhar();
+        });
+    }
+
+    // Parte do corpo do gráfico visível na área de rolagem (coordenadas do corpo)
+    calcularArea() {
+        const larguraTotal = this.container.clientWidth;
+        const alturaTotal = this.itens.length * this.alturaLinha;
+        const largura = Math.min(this.rolagem.clientWidth, larguraTotal);
+        const altura = Math.min(this.rolagem.clientHeight, alturaTotal);
+        const rolagemRect = this.rolagem.getBoundingClientRect();
+        const containerRect = this.container.getBoundingClientRect();
+        const limitar = (valor, maximo) => Math.max(0, Math.min(valor, maximo));
+        return {
+            x: limitar(rolagemRect.left - containerRect.left, larguraTotal - largura),
+            y: limitar(rolagemRect.top - containerRect.top, alturaTotal - altura),
+            largura: largura,
+            altura: altura,
+        };
+    }
+
+    padraoHachura() {
+        // Equivalente ao linear-gradient(45deg, ...) 8x8 da .gantt-bar-overlap
+        if (!this.hachura) {
+            const ladrilho = document.createElement('canvas');
+            ladrilho.width = ladrilho.height = 8;
+            const ctx = ladrilho.getContext('2d');
+            ctx.strokeStyle = 'rgba(0, 0, 0, 0.25)';
+            ctx.lineWidth = 8 * Math.SQRT2 / 4;
+            ctx.beginPath();
+            for (const d of [-8, 0, 8]) {
+                ctx.moveTo(d, 8);
+                ctx.lineTo(d + 8, 0);
+            }
+            ctx.stroke();
+            this.hachura = this.contexto.createPattern(ladrilho, 'repeat');
+        }
+        return this.hachura;
+    }
+
+    desenhar() {
+        if (!this.ativa()) return;
+        const area = this.area = this.calcularArea();
+        if (area.largura <= 0 || area.altura <= 0) return;
+
+        const escala = window.devicePixelRatio || 1;
+        const larguraPx = Math.round(area.largura * escala), alturaPx = Math.round(area.altura * escala);
+        if (this.canvas.width !== larguraPx || this.canvas.height !== alturaPx) {
+            this.canvas.width = larguraPx;
+            this.canvas.height = alturaPx;
+            this.canvas.style.width = area.largura + 'px';
+            this.canvas.style.height = area.altura + 'px';
+        }
+        this.canvas.style.left = area.x + 'px';
+        this.canvas.style.top = area.y + 'px';
+        if (!this.fonte) this.fonte = '600 8px ' + getComputedStyle(this.container).fontFamily;
+
+        const ctx = this.contexto;
+        ctx.setTransform(escala, 0, 0, escala, -area.x * escala, -area.y * escala);
+        ctx.fillStyle = 'white';
+        ctx.fillRect(area.x, area.y, area.largura, area.altura);
+
+        const h = this.alturaLinha;
+        const primeira = Math.floor(area.y / h);
+        const ultima = Math.min(this.itens.length, Math.ceil((area.y + area.altura) / h));
+
+        // Bordas das linhas, divisores de mês e linha de hoje ficam sob as barras
+        ctx.fillStyle = '#eff2f5';
+        for (let indice = primeira; indice < ultima; indice++) {
+            ctx.fillRect(area.x, (indice + 1) * h - 1, area.largura, 1);
+        }
+        this.verticais.forEach(linha => {
+            if (linha.x < area.x - 1 || linha.x > area.x + area.largura) return;
+            ctx.fillStyle = linha.cor;
+            ctx.fillRect(linha.x, area.y, 1, area.altura);
+        });
+
+        const focoAtivo = this.opcoes.modoFoco ? this.opcoes.modoFoco() : false;
+        ctx.font = this.fonte;
+        ctx.textBaseline = 'middle';
+        for (let indice = primeira; indice < ultima; indice++) {
+            const topo = indice * h + this.topoBarra;
+            this.opcoes.barrasDaLinha(this.itens[indice], indice).forEach(barra => {
+                if (barra.left > area.x + area.largura || barra.left + barra.width < area.x) return;
+                const esmaecida = focoAtivo && !barra.hachura && !this.focadas.has(indice + ':' + barra.tipo);
+                if (esmaecida) {
+                    ctx.globalAlpha = 0.5;
+                    ctx.filter = 'grayscale(100%) brightness(0.4)';
+                }
+                ctx.fillStyle = barra.hachura ? this.padraoHachura() : barra.cor;
+                ctx.beginPath();
+                if (ctx.roundRect) ctx.roundRect(barra.left, topo, barra.width, this.alturaBarra, 3);
+                else ctx.rect(barra.left, topo, barra.width, this.alturaBarra);
+                ctx.fill();
+
+                // Rótulo recortado na barra (padding de 5px, como o .bar-label)
+                if (barra.rotulo && barra.width > 10) {
+                    ctx.save();
+                    ctx.beginPath();
+                    ctx.rect(barra.left + 5, topo, barra.width - 10, this.alturaBarra);
+                    ctx.clip();
+                    ctx.fillStyle = barra.corRotulo;
+                    ctx.fillText(barra.rotulo, barra.left + 5, topo + this.alturaBarra / 2);
+                    ctx.restore();
+                }
+                if (esmaecida) {
+                    ctx.globalAlpha = 1;
+                    ctx.filter = 'none';
+                }
+            });
+        }
+    }
+
+    // Barra (sem a hachura) sob o ponteiro, ou null
+    barraNoPonto(evento) {
+        const rect = this.canvas.getBoundingClientRect();
+        const x = evento.clientX - rect.left + this.area.x;
+        const y = evento.clientY - rect.top + this.area.y;
+        const indice = Math.floor(y / this.alturaLinha);
+        const dentroDaLinha = y - indice * this.alturaLinha;
+        if (indice < 0 || indice >= this.itens.length) return null;
+        if (dentroDaLinha < this.topoBarra || dentroDaLinha > this.topoBarra + this.alturaBarra) return null;
+
+        const barras = this.opcoes.barrasDaLinha(this.itens[indice], indice);
+        for (let i = barras.length - 1; i >= 0; i--) {
+            const barra = barras[i];
+            if (!barra.hachura && x >= barra.left && x <= barra.left + barra.width) {
+                return { indice: indice, item: this.itens[indice], tipo: barra.tipo };
+            }
+        }
+        return null;
+    }
+
+    aoMoverMouse(evento) {
+        const alvo = this.barraNoPonto(evento);
+        this.canvas.style.cursor = alvo ? 'pointer' : '';
+        if (alvo) {
+            if (this.opcoes.mostrarTooltip) this.opcoes.mostrarTooltip(evento, alvo.item, alvo.tipo);
+        } else if (this.opcoes.esconderTooltip) {
+            this.opcoes.esconderTooltip();
+        }
+    }
+
+    aoClicar(evento) {
+        if (!this.opcoes.modoFoco || !this.opcoes.modoFoco()) return;
+        const alvo = this.barraNoPonto(evento);
+        if (!alvo) return;
+        const chave = alvo.indice + ':' + alvo.tipo;
+        if (!this.focadas.delete(chave)) this.focadas.add(chave);
+        this.desenhar();
+    }
+}
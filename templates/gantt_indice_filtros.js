@@ -0,0 +1,136 @@
+// gantt_indice_filtros.js
+// Filtros das listas de tarefas do Gantt por bitmap (ver indice_filtros.py).
+//
+// O applyFiltersAndRedraw copiava (JSON) todas as tarefas da etapa/setor e
+// aplicava cada filtro com includes por tarefa; o filtro de grupos ainda
+// normalizava a lista de etapas do grupo a cada tarefa. Aqui cada campo
+// filtrável da lista é um código por tarefa (vindo do Python, no payload, ou
+// montado aqui na primeira vez); uma seleção vira um bitmap de tarefas em uma
+// passada pelos códigos, decidindo cada valor distinto uma única vez, e os
+// filtros são combinados com AND palavra a palavra. Só as tarefas que passam
+// são copiadas.
+//
+// Uso:
+//   const indices = new IndicesFiltrosGantt(GANTT_DADOS.indices_filtros, ['empreendimento', 'etapa']);
+//   const tarefas = indices.filtrar(setor, allTasks_baseData, [
+//       ['empreendimento', ['Emp A', 'Emp B']],       // valores aceitos
+//       ['etapa', etapa => etapa.startsWith('PE.')],  // ou função do valor
+//       ['etapa', null],                              // null: sem filtro
+//   ]);
+class IndiceFiltros {
+    // colunas: {campo: {valores: [...], codigos: [...]}} (código -1 = vazio)
+    constructor(n, colunas) {
+        this.n = n;
+        this.colunas = {};
+        Object.keys(colunas).forEach(campo => {
+            this.colunas[campo] = {
+                valores: colunas[campo].valores,
+                codigos: Int32Array.from(colunas[campo].codigos),
+            };
+        });
+    }
+
+    static dasTarefas(tarefas, campos) {
+        const colunas = {};
+        campos.forEach(campo => {
+            const posicoes = new Map();
+            const valores = [];
+            const codigos = new Int32Array(tarefas.length);
+            tarefas.forEach((tarefa, i) => {
+                const valor = tarefa[campo];
+                if (valor === null || valor === undefined) {
+                    codigos[i] = -1;
+                    return;
+                }
+                let codigo = posicoes.get(valor);
+                if (codigo === undefined) {
+                    codigo = valores.length;
+                    posicoes.set(valor, codigo);
+                    valores.push(valor);
+                }
+                codigos[i] = codigo;
+            });
+            colunas[campo] = { valores: valores, codigos: codigos };
+        });
+        return new IndiceFiltros(tarefas.length, colunas);
+    }
+
+    // Bitmap (Uint32Array, um bit por tarefa) das tarefas cujo valor do campo é aceito
+    bitmapDoCampo(campo, selecao) {
+        const coluna = this.colunas[campo];
+        let aceita;
+        if (typeof selecao === 'function') {
+            aceita = selecao;
+        } else {
+            const conjunto = new Set(selecao);
+            aceita = valor => conjunto.has(valor);
+        }
+        const aceitos = Uint8Array.from(coluna.valores, valor => aceita(valor) ? 1 : 0);
+
+        const bitmap = new Uint32Array((this.n + 31) >>> 5);
+        const codigos = coluna.codigos;
+        for (let i = 0; i < this.n; i++) {
+            const codigo = codigos[i];
+            if (codigo >= 0 && aceitos[codigo]) bitmap[i >>> 5] |= 1 << (i & 31);
+        }
+        return bitmap;
+    }
+
+    // filtros: [[campo, valores aceitos | função(valor) | null], ...]; null = todas as tarefas
+    linhas(filtros) {
+        let resultado = null;
+        filtros.forEach(([campo, selecao]) => {
+            if (selecao === null || selecao === undefined) return;
+            const bitmap = this.bitmapDoCampo(campo, selecao);
+            if (resultado === null) {
+                resultado = bitmap;
+            } else {
+                for (let p = 0; p < resultado.length; p++) resultado[p] &= bitmap[p];
+            }
+        });
+        return resultado;
+    }
+
+    static selecionar(tarefas, bitmap) {
+        if (bitmap === null) return tarefas.slice();
+        const selecionadas = [];
+        for (let p = 0; p < bitmap.length; p++) {
+            let palavra = bitmap[p];
+            while (palavra !== 0) {
+                const bit = 31 - Math.clz32(palavra & -palavra);
+                selecionadas.push(tarefas[(p << 5) + bit]);
+                palavra &= palavra - 1;
+            }
+        }
+        return selecionadas;
+    }
+}
+
+// Um IndiceFiltros por lista de tarefas (etapa, setor...), do payload quando
+// ele corresponde à lista e montado a partir das tarefas caso contrário
+class IndicesFiltrosGantt {
+    constructor(doServidor, campos) {
+        this.doServidor = doServidor || {};
+        this.campos = campos;
+        this.indices = new Map();
+    }
+
+    indice(chave, tarefas) {
+        let indice = this.indices.get(chave);
+        if (indice && indice.n === tarefas.length) return indice;
+
+        const enviado = this.doServidor[chave];
+        const completo = enviado && this.campos.every(campo => enviado.colunas[campo]);
+        if (completo && enviado.n === tarefas.length) {
+            indice = new IndiceFiltros(enviado.n, enviado.colunas);
+        } else {
+            indice = IndiceFiltros.dasTarefas(tarefas, this.campos);
+        }
+        this.indices.set(chave, indice);
+        return indice;
+    }
+
+    filtrar(chave, tarefas, filtros) {
+        return IndiceFiltros.selecionar(tarefas, this.indice(chave, tarefas).linhas(filtros));
+    }
+}
@@ -0,0 +1,143 @@
+// gantt_linhas_virtuais.js
+// Renderização virtual das linhas do Gantt (sidebar e corpo do gráfico).
+//
+// Com todos os empreendimentos, as visões consolidada e por setor têm milhares
+// de linhas; criar todas no DOM a cada filtro ou troca de baseline travava o
+// navegador. LinhasVirtuais mantém no DOM só as linhas visíveis mais uma
+// margem, com dois espaçadores (acima e abaixo) que preservam a altura total,
+// então a barra de rolagem e a sincronização sidebar/gráfico continuam iguais.
+// As linhas que saem da janela voltam para um estoque e são reaproveitadas
+// pelas que entram.
+//
+// Uso:
+//   const linhas = new LinhasVirtuais(elementoComRolagem, {
+//       preencherLinha: (no, item, indice) => { no.className = '...'; ... },
+//   });
+//   linhas.definirItens(itens, container);   // redesenha tudo
+//   linhas.atualizarItem(indice);            // redesenha uma linha
+//
+// preencherLinha recebe um <div> novo ou reaproveitado e deve definir a
+// classe e todo o conteúdo da linha.
+class LinhasVirtuais {
+    constructor(rolagem, opcoes) {
+        this.rolagem = rolagem;
+        this.preencherLinha = opcoes.preencherLinha;
+        this.alturaLinha = opcoes.alturaLinha || 30;
+        // Linhas extras acima e abaixo da área visível
+        this.margem = opcoes.margem || 20;
+        // Até este número de linhas tudo é renderizado (sem virtualização)
+        this.limiar = opcoes.limiar !== undefined ? opcoes.limiar : 150;
+
+        this.container = null;
+        this.itens = [];
+        this.nos = new Map();
+        this.estoque = [];
+        this.inicio = 0;
+        this.fim = 0;
+        this.alturaMedida = false;
+        this.quadroAgendado = false;
+
+        this.espacoTopo = document.createElement('div');
+        this.espacoBase = document.createElement('div');
+        this.espacoTopo.className = this.espacoBase.className = 'linhas-virtuais-espaco';
+
+        const agendar = () => this.agendar();
+        rolagem.addEventListener('scroll', agendar, { passive: true });
+        window.addEventListener('resize', agendar);
+        if (typeof ResizeObserver !== 'undefined') new ResizeObserver(agendar).observe(rolagem);
+    }
+
+    definirItens(itens, container) {
+        if (container) this.container = container;
+        this.itens = itens || [];
+        this.nos.forEach(no => this.liberar(no));
+        this.nos.clear();
+        // O container pode ter sido limpo (innerHTML) desde a última renderização
+        if (this.espacoTopo.parentNode !== this.container || this.espacoBase.parentNode !== this.container) {
+            this.container.prepend(this.espacoTopo);
+            this.container.append(this.espacoBase);
+        }
+        this.inicio = this.fim = 0;
+        this.renderizar();
+    }
+
+    atualizarItem(indice) {
+        const no = this.nos.get(indice);
+        if (no) this.preencherLinha(no, this.itens[indice], indice);
+    }
+
+    atualizarItens(predicado) {
+        this.nos.forEach((no, indice) => {
+            if (predicado(this.itens[indice], indice)) this.preencherLinha(no, this.itens[indice], indice);
+        });
+    }
+
+    agendar() {
+        if (this.quadroAgendado || !this.container) return;
+        this.quadroAgendado = true;
+        requestAnimationFrame(() => {
+            this.quadroAgendado = false;
+            this.renderizar();
+        });
+    }
+
+    janela() {
+        const total = this.itens.length;
+        if (total <= this.limiar) return [0, total];
+        // Distância entre o topo do container e o topo da área visível
+        const deslocamento = this.rolagem.getBoundingClientRect().top - this.container.getBoundingClientRect().top;
+        const primeira = Math.floor(Math.max(0, deslocamento) / this.alturaLinha);
+        const visiveis = Math.ceil(this.rolagem.clientHeight / this.alturaLinha);
+        return [Math.max(0, primeira - this.margem), Math.min(total, primeira + visiveis + this.margem)];
+    }
+
+    renderizar() {
+        // Sem os espaçadores o container foi limpo por outro modo de renderização
+        if (!this.container || this.espacoBase.parentNode !== this.container) return;
+        const [inicio, fim] = this.janela();
+
+        this.nos.forEach((no, indice) => {
+            if (indice < inicio || indice >= fim) {
+                this.liberar(no);
+                this.nos.delete(indice);
+            }
+        });
+
+        // De baixo para cima, inserindo cada linha antes da seguinte
+        let seguinte = this.espacoBase;
+        for (let indice = fim - 1; indice >= inicio; indice--) {
+            let no = this.nos.get(indice);
+            if (!no) {
+                no = this.estoque.pop() || document.createElement('div');
+                this.preencherLinha(no, this.itens[indice], indice);
+                this.nos.set(indice, no);
+            }
+            if (no.nextSibling !== seguinte || no.parentNode !== this.container) {
+                this.container.insertBefore(no, seguinte);
+            }
+            seguinte = no;
+        }
+
+        this.inicio = inicio;
+        this.fim = fim;
+        this.espacoTopo.style.height = (inicio * this.alturaLinha) + 'px';
+        this.espacoBase.style.height = ((this.itens.length - fim) * this.alturaLinha) + 'px';
+
+        // A altura real vem do CSS; corrige a estimativa na primeira linha visível
+        if (!this.alturaMedida && fim > inicio) {
+            const altura = this.nos.get(inicio).offsetHeight;
+            if (altura > 0) {
+                this.alturaMedida = true;
+                if (altura !== this.alturaLinha) {
+                    this.alturaLinha = altura;
+                    this.renderizar();
+                }
+            }
+        }
+    }
+
+    liberar(no) {
+        no.remove();
+        if (this.estoque.length < 2 * this.margem + 100) this.estoque.push(no);
+    }
+}
@@ -0,0 +1,78 @@
+// gantt_ponte_componente.js
+// Comunicação do documento do Gantt com o componente_gantt que o hospeda.
+//
+// Dentro do componente (templates/componente_gantt/index.html) as ações do
+// usuário vão para o Python por mensagem, sem query params nem recarga da
+// página; a resposta do Python volta pelo mesmo caminho. Fora dele (HTML
+// aberto direto, components.html) enviarAcaoGantt retorna false e o template
+// segue pelo caminho antigo.
+//
+// O componente também entrega ao documento vivo o delta do Python (baselines
+// salvas, ver app.baselines_salvas_gantt): o documento troca só os
+// task.baselines e as opções dos dropdowns, sem ser recarregado.
+//
+// Uso:
+//   if (enviarAcaoGantt({ tipo: 'criar_baseline', empreendimento: nome })) { ... }
+//   aoResponderAcaoGantt(resposta => { ... });   // { id, tipo, ok, mensagem }
+//   aoReceberDeltaGantt(delta => { ... });       // { baselines, opcoes }
+
+function ganttHospedadoNoComponente() {
+    try {
+        return window.parent !== window && window.parent.GANTT_HOST === true;
+    } catch (erro) {
+        // Pai de outra origem: não é o componente
+        return false;
+    }
+}
+
+function enviarAcaoGantt(acao) {
+    if (!ganttHospedadoNoComponente()) return false;
+    window.parent.postMessage({ gantt: 'acao', acao: acao }, '*');
+    return true;
+}
+
+function aoResponderAcaoGantt(tratador) {
+    window.addEventListener('message', function (evento) {
+        if (evento.source !== window.parent || !evento.data || evento.data.gantt !== 'resposta') return;
+        tratador(evento.data.resposta);
+    });
+}
+
+function aoReceberDeltaGantt(tratador) {
+    window.addEventListener('message', function (evento) {
+        if (evento.source !== window.parent || !evento.data || evento.data.gantt !== 'delta') return;
+        try {
+            tratador(evento.data.delta);
+        } catch (erro) {
+            console.error('[GANTT] Erro ao aplicar o delta:', erro);
+        }
+    });
+}
+
+// Troca task.baselines de cada tarefa pelo P0 da própria tarefa mais as
+// baselines salvas do delta: baselines = {emp: {etapa: {baseline: {start, end}}}};
+// chaveDe(tarefa) = [empreendimento, etapa]
+function trocarBaselinesDasTarefas(tarefas, baselines, chaveDe) {
+    (tarefas || []).forEach(function (tarefa) {
+        const chave = chaveDe(tarefa);
+        const p0 = tarefa.baselines && tarefa.baselines['P0-(padrão)'];
+        const salvas = (baselines[chave[0]] || {})[chave[1]] || {};
+        tarefa.baselines = Object.assign(p0 ? { 'P0-(padrão)': p0 } : {}, salvas);
+    });
+}
+
+// Opções de um <select> de baseline: P0 e as baselines salvas. Mantém a
+// seleção se ela ainda existe (senão volta ao P0); retorna o valor final.
+function atualizarOpcoesBaseline(select, opcoes) {
+    const anterior = select.value;
+    const nomes = ['P0-(padrão)'].concat((opcoes || []).filter(function (nome) { return nome !== 'P0-(padrão)'; }));
+    select.innerHTML = '';
+    nomes.forEach(function (nome) {
+        const opcao = document.createElement('option');
+        opcao.value = nome;
+        opcao.textContent = nome;
+        select.appendChild(opcao);
+    });
+    select.value = nomes.includes(anterior) ? anterior : 'P0-(padrão)';
+    return select.value;
+}
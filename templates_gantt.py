@@ -0,0 +1,117 @@
+# templates_gantt.py
+# HTML/CSS/JS dos gráficos de Gantt em arquivos de template (templates/).
+#
+# Os três geradores do app montavam milhares de linhas de HTML com f-strings a
+# cada chamada (com todas as chaves do JS escapadas). Agora cada template é
+# lido e compilado uma vez, na importação, em uma lista de trechos literais e
+# campos <%= nome %>; renderizar só intercala os valores. Os dados volumosos
+# não passam por aqui: vão para o payload de payload_gantt e o template recebe
+# apenas o carregador.
+
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+
+from payload_gantt import TIPO_SCRIPT_ADIADO
+
+PASTA_TEMPLATES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates")
+ARQUIVOS_TEMPLATES = {
+    "projeto": "gantt_projeto.html",
+    "consolidado": "gantt_consolidado.html",
+    "setor": "gantt_setor.html",
+}
+# Scripts compartilhados entre as visões, embutidos pelos templates
+ARQUIVOS_SCRIPTS = {
+    "js_linhas_virtuais": "gantt_linhas_virtuais.js",
+    "js_camada_canvas": "gantt_camada_canvas.js",
+    "js_ponte_componente": "gantt_ponte_componente.js",
+    "js_indice_filtros": "gantt_indice_filtros.js",
+}
+# Quantos HTMLs finais manter em memória (por visão, versão dos dados e
+# filtros). Sem servidor estático cada um carrega os dados embutidos (MBs).
+MAX_HTML_EM_CACHE = 6
+# Campo com o carregador dos dados (payload_gantt.html_carregador), que entra
+# na chave de cache pela sua chave, não pelo texto
+CAMPO_CARREGADOR = "carregador_dados"
+
+_PADRAO_CAMPO = re.compile(r"<%=\s*(\w+)\s*%>")
+
+
+def _ler_arquivo(nome, pasta=PASTA_TEMPLATES):
+    with open(os.path.join(pasta, nome), encoding="utf-8") as f:
+        return f.read()
+
+
+# Campos com o mesmo valor em toda renderização, resolvidos na compilação
+VALORES_FIXOS = {"tipo_script_adiado": TIPO_SCRIPT_ADIADO}
+VALORES_FIXOS.update({campo: _ler_arquivo(arquivo) for campo, arquivo in ARQUIVOS_SCRIPTS.items()})
+
+
+class TemplateCompilado:
+    """Template dividido em trechos literais e nomes de campo, na ordem do texto."""
+
+    def __init__(self, texto, nome="", fixos=VALORES_FIXOS):
+        texto = _PADRAO_CAMPO.sub(lambda m: fixos.get(m.group(1), m.group(0)), texto)
+        partes = _PADRAO_CAMPO.split(texto)
+        self.nome = nome
+        self.literais = partes[0::2]
+        self.campos = partes[1::2]
+        self.nomes_campos = frozenset(self.campos)
+
+    def renderizar(self, valores):
+        faltando = self.nomes_campos - valores.keys()
+        if faltando:
+            raise KeyError(f"Template '{self.nome}' sem valor para: {', '.join(sorted(faltando))}")
+
+        pedacos = [self.literais[0]]
+        for campo, literal in zip(self.campos, self.literais[1:]):
+            pedacos.append(str(valores[campo]))
+            pedacos.append(literal)
+        return "".join(pedacos)
+
+
+def carregar_templates(pasta=PASTA_TEMPLATES):
+    templates = {}
+    for visao, arquivo in ARQUIVOS_TEMPLATES.items():
+        templates[visao] = TemplateCompilado(_ler_arquivo(arquivo, pasta), arquivo)
+    return templates
+
+
+TEMPLATES = carregar_templates()
+
+
+# (visao, chave do carregador, hash dos demais campos) -> HTML, do mais antigo ao mais recente
+_cache_html = OrderedDict()
+_lock_cache = threading.Lock()
+
+
+def _hash_estado(valores):
+    """Hash dos campos pequenos do template (filtros, baseline, datas...), sem o carregador."""
+    estado = {campo: str(valor) for campo, valor in valores.items() if campo != CAMPO_CARREGADOR}
+    return hashlib.sha256(json.dumps(estado, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()[:16]
+
+
+def renderizar(visao, chave_carregador, valores):
+    """
+    HTML final da visão ('projeto', 'consolidado' ou 'setor'). valores traz o
+    carregador (CAMPO_CARREGADOR) e chave_carregador é a chave que
+    payload_gantt.html_carregador devolveu com ele. O cache é chaveado por
+    (visao, chave_carregador, hash dos demais campos): o texto do carregador,
+    que embute os dados sem servidor estático, não é hasheado nem comparado.
+    """
+    chave = (visao, chave_carregador, _hash_estado(valores))
+    with _lock_cache:
+        html = _cache_html.get(chave)
+        if html is not None:
+            _cache_html.move_to_end(chave)
+            return html
+
+    html = TEMPLATES[visao].renderizar(valores)
+    with _lock_cache:
+        _cache_html[chave] = html
+        while len(_cache_html) > MAX_HTML_EM_CACHE:
+            _cache_html.popitem(last=False)
+    return html
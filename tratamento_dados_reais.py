@@ -1,18 +1,39 @@
 import pandas as pd
 import smartsheet
 import os
+import io
+import json
+import tempfile
 import traceback
 import sys
+import requests
 from dotenv import load_dotenv
 import re 
 
+from snapshot_dados import DIRETORIO_CACHE, escrever_atomico
+
 # ===============================================
 # CONFIGURAÇÕES GLOBAIS
 # ===============================================
 # O NOME DO RELATÓRIO QUE VOCÊ QUER CARREGAR
 SHEET_NAME = 'Relatório MF- Smart' 
 FINAL_OUTPUT_CSV = "relatorio_macrofluxo_final.csv" 
-TEMP_DOWNLOAD_DIR = "." 
+SMARTSHEET_API_BASE = os.getenv("SMARTSHEET_API_BASE", "https://api.smartsheet.com/2.0")
+TIMEOUT_DOWNLOAD_SEGUNDOS = 120
+
+# Leitura tipada do CSV do relatório: só as colunas usadas no processamento
+TIPOS_COLUNAS_RELATORIO = {
+    'Empreendimento': str,
+    'Primário': str,
+    'Serviço': str,
+    '%': str,  # pode vir como '50%' ou '0,5'; convertido no app (converter_porcentagem)
+}
+COLUNAS_DATA_RELATORIO = ['Data de Início', 'Data de Fim']
+FORMATO_DATA_RELATORIO = os.getenv("SMARTSHEET_FORMATO_DATA", "%d/%m/%y")
+
+# Cache persistente do relatório: ID, modifiedAt e o último CSV baixado
+ARQUIVO_CACHE_RELATORIO = os.path.join(DIRETORIO_CACHE, "relatorio_smartsheet.json")
+ARQUIVO_CSV_RELATORIO = os.path.join(DIRETORIO_CACHE, "relatorio_smartsheet.csv")
 
 def carregar_configuracao():
     """Carrega as configurações e verifica o ambiente"""
@@ -94,24 +115,147 @@ def get_report_id(client, report_name):
         print(f"\nErro inesperado ao buscar relatórios: {str(e)}")
         return None
 
-def get_report_data(client, report_id):
-    """Baixa o relatório diretamente como CSV e o converte para DataFrame."""
-    
-    downloaded_file_path = None 
-    
+def get_report_modified_at(client, report_id):
+    """Obtém a data de modificação (modifiedAt) do Relatório sem baixar as linhas."""
     try:
-        print("\nObtendo dados do Relatório (via CSV)...")
-        print(f"INFO: Solicitando download para o diretório: '{TEMP_DOWNLOAD_DIR}'")
-        
-        result = client.Reports.get_report_as_csv(
-            report_id,
-            download_path=TEMP_DOWNLOAD_DIR
-        )
-        
-        downloaded_file_path = result.filename
-        print(f"INFO: Download concluído. Arquivo salvo como: '{downloaded_file_path}'")
-        
-        df = pd.read_csv(downloaded_file_path, sep=',')
+        report = client.Reports.get_report(report_id, page_size=1)
+        modified_at = getattr(report, 'modified_at', None)
+        return str(modified_at) if modified_at else None
+    except Exception as e:
+        print(f"\nAVISO: Não foi possível consultar a data de modificação do relatório: {str(e)}")
+        return None
+
+def carregar_cache_relatorio():
+    """Lê o cache persistente do relatório (dict vazio se não existir)."""
+    try:
+        with open(ARQUIVO_CACHE_RELATORIO, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def salvar_cache_relatorio(cache):
+    try:
+        def escrever(tmp):
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(cache, f, ensure_ascii=False)
+        escrever_atomico(ARQUIVO_CACHE_RELATORIO, escrever)
+    except Exception as e:
+        print(f"AVISO: Não foi possível salvar o cache do relatório: {e}")
+
+def resolver_relatorio(client, report_name):
+    """
+    Retorna (report_id, modified_at) do relatório.
+    O ID fica em cache em disco, então o list_reports só roda na primeira
+    vez ou quando o ID guardado deixa de responder (relatório recriado).
+    """
+    cache = carregar_cache_relatorio()
+    report_id = cache.get("report_id") if cache.get("nome") == report_name else None
+
+    if report_id:
+        modified_at = get_report_modified_at(client, report_id)
+        if modified_at:
+            return report_id, modified_at
+        print("AVISO: ID do relatório em cache não respondeu. Buscando novamente...")
+
+    report_id = get_report_id(client, report_name)
+    if not report_id:
+        return None, None
+
+    if cache.get("nome") != report_name or cache.get("report_id") != report_id:
+        cache = {"nome": report_name, "report_id": report_id}
+        salvar_cache_relatorio(cache)
+
+    return report_id, get_report_modified_at(client, report_id)
+
+def baixar_relatorio_csv(client, report_id, token=None):
+    """
+    Baixa o relatório como CSV e retorna o conteúdo em bytes.
+    Com o token, a requisição vai direto à API (Accept: text/csv) e o CSV
+    fica só em memória. Sem token, ou se a requisição falhar, usa o SDK
+    num diretório temporário do sistema.
+    """
+    if token:
+        try:
+            resposta = requests.get(
+                f"{SMARTSHEET_API_BASE}/reports/{report_id}",
+                headers={"Authorization": f"Bearer {token}", "Accept": "text/csv"},
+                timeout=TIMEOUT_DOWNLOAD_SEGUNDOS,
+            )
+            resposta.raise_for_status()
+            return resposta.content
+        except Exception as e:
+            print(f"AVISO: Download direto do CSV falhou ({e}). Usando o SDK...")
+
+    with tempfile.TemporaryDirectory() as diretorio_temp:
+        result = client.Reports.get_report_as_csv(report_id, download_path=diretorio_temp)
+        caminho = os.path.join(diretorio_temp, os.path.basename(result.filename))
+        with open(caminho, 'rb') as f:
+            return f.read()
+
+def converter_datas_relatorio(serie):
+    """
+    Converte as datas do relatório usando o formato fixo (sem inferência).
+    Valores fora do formato são reinterpretados com dayfirst=True.
+    """
+    datas = pd.to_datetime(serie, format=FORMATO_DATA_RELATORIO, errors='coerce')
+    fora_do_formato = datas.isna() & serie.notna()
+    if fora_do_formato.any():
+        datas[fora_do_formato] = pd.to_datetime(serie[fora_do_formato], dayfirst=True, errors='coerce')
+    return datas
+
+def ler_csv_relatorio(conteudo):
+    """
+    Lê o CSV do relatório já com os tipos declarados e apenas as colunas
+    usadas (as demais nem chegam a ser convertidas em objetos). As datas são
+    convertidas com o formato fixo logo após a leitura.
+    """
+    colunas_usadas = set(TIPOS_COLUNAS_RELATORIO) | set(COLUNAS_DATA_RELATORIO)
+    df = pd.read_csv(
+        io.BytesIO(conteudo),
+        sep=',',
+        usecols=lambda col: col in colunas_usadas,
+        dtype={**TIPOS_COLUNAS_RELATORIO, **{col: str for col in COLUNAS_DATA_RELATORIO}},
+    )
+    for col in COLUNAS_DATA_RELATORIO:
+        if col in df.columns:
+            df[col] = converter_datas_relatorio(df[col])
+    return df
+
+def get_report_data(client, report_id, modified_at=None, token=None):
+    """
+    Obtém o relatório como CSV e o converte para DataFrame.
+    Se o modifiedAt for o mesmo do último download, reaproveita o CSV em
+    cache; senão baixa de novo e atualiza o cache.
+    """
+    try:
+        cache = carregar_cache_relatorio()
+        conteudo = None
+
+        if (modified_at and cache.get("report_id") == report_id
+                and cache.get("modified_at") == modified_at
+                and os.path.exists(ARQUIVO_CSV_RELATORIO)):
+            print("\nINFO: Relatório não mudou desde o último download. Usando o CSV em cache.")
+            with open(ARQUIVO_CSV_RELATORIO, 'rb') as f:
+                conteudo = f.read()
+
+        if conteudo is None:
+            print("\nObtendo dados do Relatório (via CSV)...")
+            conteudo = baixar_relatorio_csv(client, report_id, token)
+            print(f"INFO: Download concluído ({len(conteudo) / 1024:.0f} KB).")
+
+            if modified_at:
+                def escrever_csv(tmp):
+                    with open(tmp, 'wb') as f:
+                        f.write(conteudo)
+
+                try:
+                    escrever_atomico(ARQUIVO_CSV_RELATORIO, escrever_csv)
+                    cache.update({"report_id": report_id, "modified_at": modified_at})
+                    salvar_cache_relatorio(cache)
+                except Exception as e:
+                    print(f"AVISO: Não foi possível guardar o CSV em cache: {e}")
+
+        df = ler_csv_relatorio(conteudo)
         
         print(f"INFO: CSV lido para DataFrame. {len(df)} linhas encontradas.")
 
@@ -125,15 +269,6 @@ def get_report_data(client, report_id):
         traceback.print_exc()
         return pd.DataFrame()
 
-    finally:
-        # Garante que o arquivo temporário seja limpo
-        if downloaded_file_path and os.path.exists(downloaded_file_path):
-            try:
-                os.remove(downloaded_file_path)
-                print(f"INFO: Arquivo temporário '{downloaded_file_path}' removido.")
-            except Exception as e:
-                print(f"AVISO: Não foi possível remover o arquivo temporário '{downloaded_file_path}'. {e}")
-
 
 # ===================================================================
 # FUNÇÃO DE PROCESSAMENTO (Idêntica em ambos os scripts)
@@ -212,8 +347,8 @@ def processar_dados_macrofluxo(df):
         # 7. LIMPEZA FINAL
         df_final = df_melted.drop(columns=['Atributo'])
         
-        # O 'dayfirst=True' é importante para CSVs que podem ter formato DD/MM/AAAA
-        df_final['Valor'] = pd.to_datetime(df_final['Valor'], dayfirst=True, errors='coerce').dt.date
+        # As datas já chegam como datetime (ler_csv_relatorio)
+        df_final['Valor'] = df_final['Valor'].dt.date
         
         if '%' in df_final.columns:
              df_final = df_final.rename(columns={'%': '%_Concluido'})
@@ -280,14 +415,14 @@ def buscar_e_processar_dados_completos():
         print("ERRO (MASTER): Falha ao conectar ao Smartsheet.")
         return pd.DataFrame()
 
-    # 2. Buscar ID do Relatório
-    report_id = get_report_id(client, SHEET_NAME) # SHEET_NAME é global
+    # 2. Buscar ID do Relatório (em cache) e a data de modificação
+    report_id, modified_at = resolver_relatorio(client, SHEET_NAME) # SHEET_NAME é global
     if not report_id: 
         print(f"ERRO (MASTER): Relatório '{SHEET_NAME}' não encontrado.")
         return pd.DataFrame()
 
-    # 3. Obter dados brutos
-    raw_data = get_report_data(client, report_id)
+    # 3. Obter dados brutos (só baixa se o relatório mudou)
+    raw_data = get_report_data(client, report_id, modified_at, token)
     if raw_data.empty:
         print("AVISO (MASTER): Nenhum dado foi baixado do Smartsheet.")
         return pd.DataFrame()
@@ -303,6 +438,23 @@ def buscar_e_processar_dados_completos():
     return processed_data
 
 
+def obter_versao_relatorio():
+    """
+    Retorna a versão atual do relatório (modifiedAt) para o app decidir se
+    precisa baixar os dados de novo. Retorna None se não for possível verificar.
+    """
+    token = carregar_configuracao()
+    if not token:
+        return None
+
+    client = setup_smartsheet_client(token)
+    if not client:
+        return None
+
+    _, modified_at = resolver_relatorio(client, SHEET_NAME)
+    return modified_at
+
+
 # ===================================================================
 # FUNÇÃO 'main' FINAL (Para execução direta do script)
 # ===================================================================
@@ -1,143 +1,275 @@
 import pandas as pd
 import os
+import re
+
+from motor_atualizacao import assinatura_arquivo
+from snapshot_dados import DIRETORIO_CACHE, escrever_atomico
+
+# python-calamine (opcional) lê o xlsx bem mais rápido que o openpyxl
+try:
+    import python_calamine  # noqa: F401
+    MOTOR_EXCEL = "calamine"
+except ImportError:
+    MOTOR_EXCEL = "openpyxl"
+
+NOME_ARQUIVO_MACROFLUXO = "GRÁFICO MACROFLUXO.xlsx"
+ABA_GERAL = "GERAL"
+LINHA_CABECALHO = 6  # linha 7 da planilha
+
+# Cache do resultado tratado, chaveado pelo hash do arquivo.
+# Incrementar VERSAO_CACHE_MACROFLUXO sempre que o tratamento mudar.
+VERSAO_CACHE_MACROFLUXO = 1
+PREFIXO_CACHE_MACROFLUXO = "macrofluxo-"
+_CACHE_MACROFLUXO = {}
+
+def obter_caminho_planilha():
+    """Caminho absoluto do GRÁFICO MACROFLUXO.xlsx (mesmo diretório deste script)."""
+    diretorio_atual = os.path.dirname(os.path.abspath(__file__))
+    return os.path.join(diretorio_atual, NOME_ARQUIVO_MACROFLUXO)
+
+# Padrões dos cabeçalhos de data: 'ETAPA.TIPO.INICIO_FIM' ou 'ETAPA.INICIO_FIM'
+PADRAO_ATRIBUTO_COMPLETO = re.compile(r'(.+)\.(REAL|PREV)\.(INICIO|TERMINO)')
+PADRAO_ATRIBUTO_SIMPLES = re.compile(r'(.+)\.(INICIO|TERMINO)')
+PADRAO_ETAPA_TIPO = re.compile(r'(.+)\.(REAL|PREV)')
+
+def extrair_atributos(atributo):
+    """
+    Divide um cabeçalho de data em (Etapa, Tipo_Data, Inicio_Fim).
+    Retorna (None, None, None) se o cabeçalho não seguir nenhum padrão.
+    """
+    if not isinstance(atributo, str):
+        return (None, None, None)
+
+    # Tenta o padrão completo: ETAPA.TIPO.INICIO_FIM
+    match_completo = PADRAO_ATRIBUTO_COMPLETO.search(atributo)
+    if match_completo:
+        return match_completo.groups()
+
+    # Tenta o padrão incompleto: ETAPA.INICIO_FIM
+    match_simples = PADRAO_ATRIBUTO_SIMPLES.search(atributo)
+    if match_simples:
+        # Se for o padrão incompleto, assumimos 'PREV'
+        etapa_tipo, inicio_fim = match_simples.groups()
+
+        match_tipo = PADRAO_ETAPA_TIPO.search(etapa_tipo)
+        if match_tipo:
+            # Encontrou o tipo (ex: 'PULVENDA.PREV')
+            return (match_tipo.group(1), match_tipo.group(2), inicio_fim)
+        # Não encontrou o tipo (ex: 'EXECUÇÃO ÁREAS COMUNS')
+        return (etapa_tipo, 'PREV', inicio_fim)
+
+    # Caso não encontre nenhum padrão, retorna nulo
+    return (None, None, None)
+
+def extrair_atributos_colunas(colunas):
+    """
+    Interpreta cada cabeçalho uma única vez.
+    Retorna um DataFrame indexado pelo cabeçalho com Etapa, Tipo_Data e Inicio_Fim.
+    """
+    colunas = list(dict.fromkeys(colunas))
+    return pd.DataFrame(
+        [extrair_atributos(col) for col in colunas],
+        index=pd.Index(colunas, dtype=object),
+        columns=['Etapa', 'Tipo_Data', 'Inicio_Fim'],
+    )
+
+def eh_coluna_data(col):
+    """Indica se o cabeçalho é uma coluna de data (vai para o unpivot)."""
+    return (
+               ".PREV.INICIO" in str(col) or ".PREV.TERMINO" in str(col) or 
+               ".REAL.INICIO" in str(col) or ".REAL.TERMINO" in str(col)
+           ) or \
+           (
+               "EXECUÇÃO ÁREAS COMUNS" in str(col).upper() and 
+               ("INICIO" in str(col).upper() or "TERMINO" in str(col).upper())
+           ) \
+           and str(col) not in ['UGB', 'EMP', 'TIPO_LOTES']
+
+def ler_aba_geral(caminho_arquivo):
+    """
+    Lê da aba GERAL apenas as colunas que o tratamento usa: as quatro
+    primeiras (índice, UGB, EMP e TIPO_LOTES) e as datas previstas.
+    Primeiro lê só a linha de cabeçalho para decidir as colunas; as
+    colunas REAL, vazias e de formatação nem chegam a ser convertidas.
+    """
+    cabecalho = pd.read_excel(caminho_arquivo, sheet_name=ABA_GERAL, header=LINHA_CABECALHO,
+                              nrows=0, engine=MOTOR_EXCEL)
+
+    posicoes = [
+        i for i, col in enumerate(cabecalho.columns)
+        if i < 4 or (eh_coluna_data(col) and extrair_atributos(col)[1] == 'PREV')
+    ]
+
+    return pd.read_excel(caminho_arquivo, sheet_name=ABA_GERAL, header=LINHA_CABECALHO,
+                         usecols=posicoes, engine=MOTOR_EXCEL)
+
+def _caminho_cache(assinatura):
+    return os.path.join(
+        DIRETORIO_CACHE,
+        f"{PREFIXO_CACHE_MACROFLUXO}v{VERSAO_CACHE_MACROFLUXO}-{assinatura[:16]}.parquet"
+    )
+
+def carregar_cache_macrofluxo(assinatura):
+    """Retorna o resultado tratado para esta versão do arquivo, se houver."""
+    em_memoria = _CACHE_MACROFLUXO.get(assinatura)
+    if em_memoria is not None:
+        return em_memoria.copy()
+
+    caminho_cache = _caminho_cache(assinatura)
+    if not os.path.exists(caminho_cache):
+        return None
+
+    try:
+        df = pd.read_parquet(caminho_cache)
+        _CACHE_MACROFLUXO.clear()
+        _CACHE_MACROFLUXO[assinatura] = df
+        return df.copy()
+    except Exception as e:
+        print(f"[MACROFLUXO] Falha ao ler o cache da planilha: {e}")
+        return None
+
+def salvar_cache_macrofluxo(assinatura, df):
+    """Guarda o resultado tratado em memória e em disco (Parquet)."""
+    _CACHE_MACROFLUXO.clear()
+    _CACHE_MACROFLUXO[assinatura] = df.copy()
+
+    try:
+        caminho_cache = _caminho_cache(assinatura)
+        escrever_atomico(caminho_cache, lambda tmp: df.to_parquet(tmp, index=False))
+
+        # Remove os caches de versões anteriores da planilha
+        nome_atual = os.path.basename(caminho_cache)
+        for nome in os.listdir(DIRETORIO_CACHE):
+            if nome.startswith(PREFIXO_CACHE_MACROFLUXO) and nome != nome_atual:
+                try:
+                    os.remove(os.path.join(DIRETORIO_CACHE, nome))
+                except OSError:
+                    pass
+    except Exception as e:
+        print(f"[MACROFLUXO] Falha ao salvar o cache da planilha: {e}")
 
 def tratar_macrofluxo():
     """Carrega e trata os dados do GRÁFICOMACROFLUXO.xlsx."""
     try:
-        # ----------------------------------------------------------------------
-        # Lista de empreendimentos a serem excluídos
-        empreendimentos_a_excluir = [
-            'JARDIM DAS HOTÊNSIAS', 
-            'RECANTO DAS OLIVEIRAS'
-        ]
-        
-        # Pré-processamento da lista de exclusão para garantir a correspondência
-        empreendimentos_a_excluir_limpos = [
-            emp.strip().upper() for emp in empreendimentos_a_excluir
-        ]
-        # ----------------------------------------------------------------------
-        
-        diretorio_atual = os.path.dirname(os.path.abspath(__file__))
-        caminho_arquivo = os.path.join(diretorio_atual, "GRÁFICO MACROFLUXO.xlsx")
+        caminho_arquivo = obter_caminho_planilha()
         
         if not os.path.exists(caminho_arquivo):
             print(f"Erro: Arquivo não encontrado no caminho: {caminho_arquivo}")
             return None
 
+        # A planilha só é lida de novo quando o conteúdo do arquivo muda
+        assinatura = assinatura_arquivo(caminho_arquivo)
+        df_cache = carregar_cache_macrofluxo(assinatura)
+        if df_cache is not None:
+            return df_cache
+
         # 1. CARREGAR OS DADOS, usando a linha 7 (índice 6) como cabeçalho
-        df = pd.read_excel(caminho_arquivo, sheet_name="GERAL", header=6)
-
-        # Renomear a coluna de índice 3 (coluna D) para 'TIPO_LOTES'
-        # E as colunas 1 e 2 para UGB e EMP, conforme a inspeção
-        df = df.rename(columns={
-            df.columns[1]: 'UGB',
-            df.columns[2]: 'EMP',
-            df.columns[3]: 'TIPO_LOTES' # Coluna D, índice 3
-        })
-        
-        # ----------------------------------------------------------------------
-        # Pré-processar a coluna 'EMP' para string, remover espaços
-        # e converter para MAIÚSCULAS antes de aplicar o filtro de exclusão.
-        df['EMP_LIMPO'] = df['EMP'].astype(str).str.strip().str.upper()
-        
-        # Filtrar e excluir os empreendimentos indesejados
-        # Usamos a coluna 'EMP_LIMPO' para a filtragem
-        df = df[~df['EMP_LIMPO'].isin(empreendimentos_a_excluir_limpos)].copy()
-        
-        # Remove a coluna temporária de limpeza
-        df = df.drop(columns=['EMP_LIMPO'])
-        # ----------------------------------------------------------------------
+        try:
+            df = ler_aba_geral(caminho_arquivo)
+        except Exception as e:
+            print(f"[MACROFLUXO] Leitura restrita falhou ({e}). Lendo a aba completa.")
+            df = pd.read_excel(caminho_arquivo, sheet_name=ABA_GERAL, header=LINHA_CABECALHO)
 
-        # Remover colunas totalmente vazias
-        df = df.dropna(axis=1, how='all')
+        df_final = transformar_macrofluxo(df)
+        salvar_cache_macrofluxo(assinatura, df_final)
+        return df_final
 
-        # Remover colunas que começam com 'Unnamed:'
-        df = df.loc[:, ~df.columns.astype(str).str.startswith('Unnamed:')]
+    except Exception as e:
+        print(f"Erro durante o processamento: {str(e)}")
+        return None
 
-        # Identificar as colunas de unpivot (datas)
-        # As colunas de data agora têm o formato 'ETAPA.TIPO.INICIO_FIM'
-        
-        # CORREÇÃO MÍNIMA (mantida):
-        # Lógica para capturar a coluna "EXECUÇÃO ÁREAS COMUNS"
-        
-        colunas_unpivot = [col for col in df.columns if 
-                           (
-                               ".PREV.INICIO" in str(col) or ".PREV.TERMINO" in str(col) or 
-                               ".REAL.INICIO" in str(col) or ".REAL.TERMINO" in str(col)
-                           ) or 
-                           (
-                               "EXECUÇÃO ÁREAS COMUNS" in str(col).upper() and 
-                               ("INICIO" in str(col).upper() or "TERMINO" in str(col).upper())
-                           )
-                           and str(col) not in ['UGB', 'EMP', 'TIPO_LOTES']
-                          ]
-        
-        colunas_fixas = [col for col in df.columns if col not in colunas_unpivot]
-
-        # 2. UNPIVOT (transformar colunas de datas em linhas)
-        df_unpivoted = pd.melt(
-            df,
-            id_vars=colunas_fixas,
-            value_vars=colunas_unpivot,
-            var_name="Atributo",
-            value_name="Valor"
-        )
-
-        # 3. DIVIDIR COLUNA "Atributo" para extrair Etapa, Tipo (PREV/REAL) e Inicio_Fim
-        # Lógica de extração flexível (mantida)
-        
-        def extrair_atributos(atributo):
-            # Tenta o padrão completo: ETAPA.TIPO.INICIO_FIM
-            match_completo = pd.Series(atributo).str.extract(r'(.+)\.(REAL|PREV)\.(INICIO|TERMINO)').iloc[0]
-            if not match_completo.isnull().any():
-                return match_completo
-            
-            # Tenta o padrão incompleto: ETAPA.INICIO_FIM
-            match_simples = pd.Series(atributo).str.extract(r'(.+)\.(INICIO|TERMINO)').iloc[0]
-            if not match_simples.isnull().any():
-                # Se for o padrão incompleto, assumimos 'PREV'
-                etapa_tipo = match_simples[0]
-                inicio_fim = match_simples[1]
-                
-                match_tipo = pd.Series(etapa_tipo).str.extract(r'(.+)\.(REAL|PREV)').iloc[0]
-                if not match_tipo.isnull().any():
-                    # Encontrou o tipo (ex: 'PULVENDA.PREV')
-                    return pd.Series([match_tipo[0], match_tipo[1], inicio_fim])
-                else:
-                    # Não encontrou o tipo (ex: 'EXECUÇÃO ÁREAS COMUNS')
-                    return pd.Series([etapa_tipo, 'PREV', inicio_fim])
-            
-            # Caso não encontre nenhum padrão, retorna nulo
-            return pd.Series([None, None, None])
-
-        split_data = df_unpivoted['Atributo'].apply(extrair_atributos)
-        split_data.columns = ['Etapa', 'Tipo_Data', 'Inicio_Fim']
-        
-        df_final = pd.concat([df_unpivoted, split_data], axis=1)
-        df_final = df_final.drop(columns=['Atributo'])
+def transformar_macrofluxo(df):
+    """
+    Trata a aba GERAL já carregada (formato largo, uma coluna por data)
+    e retorna o formato longo com Etapa, Tipo_Data, Inicio_Fim e Valor.
+    """
+    # ----------------------------------------------------------------------
+    # Lista de empreendimentos a serem excluídos
+    empreendimentos_a_excluir = [
+        'JARDIM DAS HOTÊNSIAS', 
+        'RECANTO DAS OLIVEIRAS'
+    ]
+    
+    # Pré-processamento da lista de exclusão para garantir a correspondência
+    empreendimentos_a_excluir_limpos = [
+        emp.strip().upper() for emp in empreendimentos_a_excluir
+    ]
+    # ----------------------------------------------------------------------
 
-        # 4. CONVERTER TIPOS DE COLUNAS
-        df_final['UGB'] = df_final['UGB'].astype(str)
-        df_final['EMP'] = df_final['EMP'].astype(str)
-        df_final['TIPO_LOTES'] = df_final['TIPO_LOTES'].astype(str) # Alterado para string
-        df_final['Valor'] = pd.to_datetime(df_final['Valor'], errors='coerce').dt.date
+    # Renomear a coluna de índice 3 (coluna D) para 'TIPO_LOTES'
+    # E as colunas 1 e 2 para UGB e EMP, conforme a inspeção
+    df = df.rename(columns={
+        df.columns[1]: 'UGB',
+        df.columns[2]: 'EMP',
+        df.columns[3]: 'TIPO_LOTES' # Coluna D, índice 3
+    })
+    
+    # ----------------------------------------------------------------------
+    # Pré-processar a coluna 'EMP' para string, remover espaços
+    # e converter para MAIÚSCULAS antes de aplicar o filtro de exclusão.
+    df['EMP_LIMPO'] = df['EMP'].astype(str).str.strip().str.upper()
+    
+    # Filtrar e excluir os empreendimentos indesejados
+    # Usamos a coluna 'EMP_LIMPO' para a filtragem
+    df = df[~df['EMP_LIMPO'].isin(empreendimentos_a_excluir_limpos)].copy()
+    
+    # Remove a coluna temporária de limpeza
+    df = df.drop(columns=['EMP_LIMPO'])
+    # ----------------------------------------------------------------------
 
-        # 5. FILTRAR APENAS "PREV"
-        df_final = df_final[df_final['Tipo_Data'] == 'PREV'].copy()
-        
-        # 6. CRIAR ORDEM DAS ETAPAS E ORDENAR
-        etapas_unicas = df_final['Etapa'].unique()
-        mapa_ordem = {etapa: i+1 for i, etapa in enumerate(etapas_unicas)}
-        
-        df_final['Ordem_Etapa'] = df_final['Etapa'].map(mapa_ordem)
-        
-        df_final = df_final.sort_values(by=['UGB', 'EMP', 'Ordem_Etapa', 'Inicio_Fim']).reset_index(drop=True)
+    # Remover colunas totalmente vazias
+    df = df.dropna(axis=1, how='all')
 
-        return df_final
+    # Remover colunas que começam com 'Unnamed:'
+    df = df.loc[:, ~df.columns.astype(str).str.startswith('Unnamed:')]
 
-    except Exception as e:
-        print(f"Erro durante o processamento: {str(e)}")
-        return None
+    # Identificar as colunas de unpivot (datas)
+    # As colunas de data agora têm o formato 'ETAPA.TIPO.INICIO_FIM'
+    
+    # CORREÇÃO MÍNIMA (mantida):
+    # Lógica para capturar a coluna "EXECUÇÃO ÁREAS COMUNS"
+    
+    colunas_unpivot = [col for col in df.columns if eh_coluna_data(col)]
+    
+    colunas_fixas = [col for col in df.columns if col not in colunas_unpivot]
+
+    # 2. UNPIVOT (transformar colunas de datas em linhas)
+    df_unpivoted = pd.melt(
+        df,
+        id_vars=colunas_fixas,
+        value_vars=colunas_unpivot,
+        var_name="Atributo",
+        value_name="Valor"
+    )
+
+    # 3. DIVIDIR COLUNA "Atributo" para extrair Etapa, Tipo (PREV/REAL) e Inicio_Fim
+    # Os cabeçalhos são interpretados uma vez cada (são poucas dezenas) e o
+    # resultado é distribuído para as linhas do unpivot.
+    atributos_por_coluna = extrair_atributos_colunas(colunas_unpivot)
+    split_data = atributos_por_coluna.reindex(df_unpivoted['Atributo'].values)
+    split_data.index = df_unpivoted.index
+
+    df_final = pd.concat([df_unpivoted, split_data], axis=1)
+    df_final = df_final.drop(columns=['Atributo'])
+
+    # 4. CONVERTER TIPOS DE COLUNAS
+    df_final['UGB'] = df_final['UGB'].astype(str)
+    df_final['EMP'] = df_final['EMP'].astype(str)
+    df_final['TIPO_LOTES'] = df_final['TIPO_LOTES'].astype(str) # Alterado para string
+    df_final['Valor'] = pd.to_datetime(df_final['Valor'], errors='coerce').dt.date
+
+    # 5. FILTRAR APENAS "PREV"
+    df_final = df_final[df_final['Tipo_Data'] == 'PREV'].copy()
+    
+    # 6. CRIAR ORDEM DAS ETAPAS E ORDENAR
+    etapas_unicas = df_final['Etapa'].unique()
+    mapa_ordem = {etapa: i+1 for i, etapa in enumerate(etapas_unicas)}
+    
+    df_final['Ordem_Etapa'] = df_final['Etapa'].map(mapa_ordem)
+    
+    df_final = df_final.sort_values(by=['UGB', 'EMP', 'Ordem_Etapa', 'Inicio_Fim']).reset_index(drop=True)
+
+    return df_final
 
 if __name__ == "__main__":
     dados_tratados = tratar_macrofluxo()
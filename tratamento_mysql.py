@@ -4,6 +4,8 @@ from mysql.connector import Error
 from datetime import datetime, timedelta
 import numpy as np
 
+from conexao_mysql import obter_pool
+
 def buscar_dados_mysql():
     """
     Busca dados do banco MySQL AWS e retorna em formato DataFrame
@@ -19,7 +21,9 @@ def buscar_dados_mysql():
             'port': 3306
         }
         
-        conn = mysql.connector.connect(**DB_CONFIG)
+        conn = obter_pool(DB_CONFIG).obter_conexao()
+        if conn is None:
+            raise ConnectionError("banco de dados indisponível")
         
         # Consulta principal para dados das etapas
         query = """
@@ -70,7 +74,9 @@ def buscar_baselines_mysql():
             'port': 3306
         }
         
-        conn = mysql.connector.connect(**DB_CONFIG)
+        conn = obter_pool(DB_CONFIG).obter_conexao()
+        if conn is None:
+            raise ConnectionError("banco de dados indisponível")
         cursor = conn.cursor(dictionary=True)
         
         query = """